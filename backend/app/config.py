@@ -5,10 +5,12 @@ from functools import lru_cache
 class Settings(BaseSettings):
     es_url: str = "http://localhost:9200"
     es_index: str = "clinical_trials"
+    es_msearch_window_ms: float = 5.0  # 0 disables search coalescing
     anthropic_api_key: str = ""
     claude_model: str = "claude-sonnet-4-20250514"
     log_level: str = "INFO"
     cors_origins: str = "http://localhost:5173"
+    web_concurrency: int = 0  # uvicorn workers; 0 = 2 * CPU cores + 1
 
     model_config = {
         "env_file": ("../.env", ".env"),
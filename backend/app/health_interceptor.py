@@ -0,0 +1,49 @@
+"""ASGI interceptor that answers liveness probes before FastAPI sees them.
+
+Liveness probes hit ``GET /health`` many times per second. The response is
+constant, so it is serialized once and written straight to the ASGI
+``send`` callable, skipping middleware, routing and response validation.
+Every other request (including ``/ready``, which does I/O) is delegated
+to the wrapped application unchanged.
+"""
+
+import json
+from typing import Any, Awaitable, Callable, Dict, FrozenSet
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class HealthInterceptor:
+    def __init__(
+        self,
+        app: ASGIApp,
+        body: Dict[str, Any],
+        paths: FrozenSet[str] = frozenset({"/health"}),
+    ) -> None:
+        self.app = app
+        self.paths = paths
+        self._body = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self._headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._body)).encode("ascii")),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and scope["path"] in self.paths
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": self._headers,
+                }
+            )
+            await send({"type": "http.response.body", "body": self._body})
+            return
+        await self.app(scope, receive, send)
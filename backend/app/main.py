@@ -1,16 +1,24 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.config import get_settings
+from app.health_interceptor import HealthInterceptor
 from app.routers.search import router as search_router
+from app.services.anthropic_client import close_anthropic_client
+from app.services.es_service import es_service
 
 settings = get_settings()
 
 logging.basicConfig(level=settings.log_level)
 
+CORS_ORIGINS = tuple(
+    origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()
+)
+
 tags_metadata = [
     {
         "name": "search",
@@ -18,23 +26,35 @@ tags_metadata = [
     },
 ]
 
-app = FastAPI(
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Flag the app ready on startup and close client pools on shutdown."""
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await es_service.es.close()
+    await close_anthropic_client()
+
+
+api = FastAPI(
     title="Clinical Trials Search API",
     description="Natural language search for clinical trials",
     version="1.0.0",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
 
-app.add_middleware(
+api.add_middleware(
     CORSMiddleware,
-    allow_origins=[origin.strip() for origin in settings.cors_origins.split(",")],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
-@app.exception_handler(Exception)
+@api.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     return JSONResponse(
         status_code=500,
@@ -42,29 +62,55 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-app.include_router(search_router, prefix="/api", tags=["search"])
+api.include_router(search_router, prefix="/api", tags=["search"])
+
+
+HEALTH_BODY = {"status": "healthy", "es_url": settings.es_url}
 
 
-@app.get("/health")
+@api.get("/health")
 def health():
-    return {"status": "healthy", "es_url": settings.es_url}
+    return HEALTH_BODY
 
 
-@app.get("/ready")
-def ready():
-    """Readiness probe that checks Elasticsearch connectivity."""
-    from elasticsearch import Elasticsearch
+@api.get("/health/live")
+def live():
+    """Liveness probe; always 200 once the process is serving."""
+    return HEALTH_BODY
+
+
+@api.get("/ready")
+async def ready(request: Request):
+    """Readiness probe that checks startup completion and Elasticsearch connectivity."""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "not ready", "detail": "Application is starting up"})
 
     try:
-        es = Elasticsearch([settings.es_url])
-        if es.ping():
+        if await es_service.es.ping():
             return {"status": "ready"}
         return JSONResponse(status_code=503, content={"status": "not ready", "detail": "Elasticsearch not reachable"})
     except Exception as exc:
         return JSONResponse(status_code=503, content={"status": "not ready", "detail": str(exc)})
 
 
+# Answer liveness probes before they reach the middleware stack; everything
+# else (including /ready, which does I/O) goes through FastAPI.
+app = HealthInterceptor(api, HEALTH_BODY, frozenset({"/health", "/health/live"}))
+
+
 if __name__ == "__main__":
+    import os
+
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers require an import string rather than the app object.
+    # Note that uvicorn's --reload cannot be combined with workers > 1; use
+    # `uvicorn app.main:app --reload` for local development instead.
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.web_concurrency or (os.cpu_count() or 1) * 2 + 1,
+    )
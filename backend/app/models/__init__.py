@@ -6,7 +6,6 @@ from .entities import (
     StatusEnum,
 )
 from .schemas import (
-    AgeCategory,
     ErrorResponse,
     Facility,
     SearchResponse,
@@ -23,7 +22,6 @@ __all__ = [
     "ExtractedEntities",
     "Sponsor",
     "Facility",
-    "AgeCategory",
     "TrialResult",
     "SearchResponse",
     "SuggestionResponse",
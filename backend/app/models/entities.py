@@ -3,7 +3,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PhaseEnum(str, Enum):
@@ -38,12 +38,17 @@ class AgeCategoryEnum(str, Enum):
 
 
 class LocationFilter(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     city: Optional[str] = None
     state: Optional[str] = None
     country: Optional[str] = None
 
 
 class ExtractedEntities(BaseModel):
+    # Frozen so instances are hashable and can key query/result caches.
+    model_config = ConfigDict(frozen=True)
+
     phase: Optional[str] = Field(None, description="Clinical trial phase")
     condition: Optional[str] = Field(None, description="Medical condition or disease")
     status: Optional[str] = Field(None, description="Trial recruitment status")
@@ -22,10 +22,6 @@ class Facility(BaseModel):
     status: Optional[str] = None
 
 
-class AgeCategory(BaseModel):
-    age_category: str
-
-
 class TrialResult(BaseModel):
     nct_id: str
     brief_title: str
@@ -39,7 +35,8 @@ class TrialResult(BaseModel):
     brief_summaries_description: Optional[str] = None
     start_date: Optional[str] = None
     completion_date: Optional[str] = None
-    age: List[AgeCategory] = Field(default_factory=list)
+    # Age categories flattened from the index's nested {"age_category": ...}.
+    age: List[str] = Field(default_factory=list)
     gender: Optional[str] = None
     study_type: Optional[str] = None
     source: Optional[str] = None
@@ -53,6 +50,7 @@ class SearchResponse(BaseModel):
     page_size: int = Field(..., ge=1)
     clarification: Optional[str] = None
     summary: Optional[str] = None
+    next_cursor: Optional[str] = None
 
 
 class SummaryResponse(BaseModel):
@@ -0,0 +1,13 @@
+"""Static resources shared by the API and the index scripts."""
+
+from importlib import resources
+from typing import Any, Dict
+
+import orjson
+
+
+def load_es_mappings() -> Dict[str, Any]:
+    """Return the clinical_trials index mappings from es_mappings.json."""
+    return orjson.loads(
+        resources.files(__name__).joinpath("es_mappings.json").read_bytes()
+    )
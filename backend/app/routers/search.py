@@ -2,59 +2,196 @@
 
 import json
 import logging
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from ..models.entities import ExtractedEntities, LocationFilter
 from ..models.schemas import SearchResponse, SuggestionResponse, SummaryResponse
-from ..services.es_service import es_service
+from ..services.es_service import decode_cursor, es_service
 from ..services.llm_service import extract_entities
 from ..services.suggestion import suggestion_service
 from ..services.summary_service import generate_summary
+from ..utils.cache import AsyncTTLCache, query_signature
+from ..utils.synonyms import PHASE_CANONICAL, STATUS_CANONICAL, canonicalize
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Query interpretations change only with the prompt, so they are kept for
+# minutes; search pages are kept briefly and refreshed in the background.
+_entity_cache: AsyncTTLCache[ExtractedEntities] = AsyncTTLCache(
+    maxsize=1024, ttl=300, stale_ttl=300
+)
+_search_cache: AsyncTTLCache[Tuple[List[Dict[str, Any]], int, Optional[str]]] = (
+    AsyncTTLCache(maxsize=1024, ttl=30, stale_ttl=30)
+)
+
+
+# Interpretations below this confidence (including the zero-confidence LLM
+# error fallbacks) are re-asked next time rather than pinned in the cache.
+MIN_CACHED_CONFIDENCE = 0.5
+
+
+async def cached_extract_entities(query: str) -> ExtractedEntities:
+    """extract_entities memoized on the query's paraphrase-tolerant signature."""
+    return await _entity_cache.get_or_set(
+        query_signature(query),
+        lambda: extract_entities(query),
+        cache_if=lambda entities: entities.confidence >= MIN_CACHED_CONFIDENCE,
+    )
+
+
+async def cached_search(
+    entities: ExtractedEntities,
+    page: int,
+    page_size: int,
+    search_after: Optional[List[Any]] = None,
+) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
+    """es_service.search memoized on the entities, page and cursor."""
+    key = (
+        entities.model_dump_json(),
+        page,
+        page_size,
+        tuple(search_after) if search_after is not None else None,
+    )
+    return await _search_cache.get_or_set(
+        key, lambda: es_service.search(entities, page, page_size, search_after)
+    )
 
-@router.get("/search/{query}", response_model=SearchResponse)
+
+def _parse_cursor(after: Optional[str]) -> Optional[List[Any]]:
+    """Decode the ``after`` query parameter, rejecting malformed cursors."""
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _search_response(
+    entities: ExtractedEntities,
+    results: List[Dict[str, Any]],
+    total: int,
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str],
+    clarification: Optional[str] = None,
+    summary: Optional[str] = None,
+) -> ORJSONResponse:
+    """Render a SearchResponse-shaped body without re-validating the hits."""
+    return ORJSONResponse(
+        content={
+            "query_interpretation": entities.model_dump(mode="json"),
+            "results": results,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "clarification": clarification,
+            "summary": summary,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get(
+    "/search/{query}",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": SearchResponse}},
+)
 async def search_trials(
     query: str,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=10, ge=1, le=100),
-) -> SearchResponse:
-    """Search clinical trials using a natural language query."""
+    after: Optional[str] = Query(default=None, description="Cursor from a previous page's next_cursor"),
+    include_summary: bool = Query(default=False, description="Also generate an AI summary of this page"),
+) -> ORJSONResponse:
+    """Search clinical trials using a natural language query.
+
+    With ``include_summary=true`` the AI summary is generated from the same
+    results and returned in ``summary``, saving the separate /summary call.
+    """
+    search_after = _parse_cursor(after)
     try:
-        entities = await extract_entities(query)
-        results, total = await es_service.search(entities, page, page_size)
-        return SearchResponse(
-            query_interpretation=entities,
-            results=results,
-            total=total,
-            page=page,
-            page_size=page_size,
+        entities = await cached_extract_entities(query)
+        results, total, next_cursor = await cached_search(
+            entities, page, page_size, search_after
+        )
+        summary = None
+        if include_summary and results:
+            summary = await generate_summary(results, query)
+        return _search_response(
+            entities, results, total, page, page_size, next_cursor,
             clarification=entities.clarification,
+            summary=summary,
         )
     except Exception as exc:
         logger.error("Search failed for query '%s': %s", query, exc, exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@router.get("/summary/{query}", response_model=SummaryResponse)
-async def get_summary(query: str) -> SummaryResponse:
-    """Generate an AI summary for a search query's results."""
+@router.get("/search/{query}/stream", response_class=StreamingResponse)
+async def stream_search_trials(
+    query: str,
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=10, ge=1, le=100),
+    after: Optional[str] = Query(default=None, description="Cursor from a previous page's next_cursor"),
+) -> StreamingResponse:
+    """Stream a page of search results as NDJSON, one trial per line.
+
+    Hits are serialized as they are produced, so clients can start
+    rendering before the whole page has been written.
+    """
+    search_after = _parse_cursor(after)
+    try:
+        entities = await cached_extract_entities(query)
+    except Exception as exc:
+        logger.error("Stream search failed for query '%s': %s", query, exc, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    async def ndjson() -> AsyncIterator[bytes]:
+        async for result in es_service.search_iter(
+            entities, page, page_size, search_after
+        ):
+            yield orjson.dumps(result) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/summary/{query}",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": SummaryResponse}},
+)
+async def get_summary(query: str) -> ORJSONResponse:
+    """Generate an AI summary for a search query's results.
+
+    Entities and first-page hits come from the same caches as /search, so a
+    summary requested right after a search does not repeat that work.
+    """
     try:
-        entities = await extract_entities(query)
-        results, _ = await es_service.search(entities, page=1, page_size=10)
+        entities = await cached_extract_entities(query)
+        results, _, _ = await cached_search(entities, page=1, page_size=10)
         summary = await generate_summary(results, query) if results else None
-        return SummaryResponse(summary=summary)
+        return ORJSONResponse(content={"summary": summary})
     except Exception as exc:
         logger.error("Summary failed for query '%s': %s", query, exc, exc_info=True)
-        return SummaryResponse(summary=None)
+        return ORJSONResponse(content={"summary": None})
 
 
-@router.get("/filter", response_model=SearchResponse)
+@router.get(
+    "/filter",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": SearchResponse}},
+)
 async def filter_trials(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=10, ge=1, le=100),
@@ -67,8 +204,20 @@ async def filter_trials(
     age_group: Optional[str] = None,
     enrollment_min: Optional[int] = None,
     enrollment_max: Optional[int] = None,
-) -> SearchResponse:
+    after: Optional[str] = Query(default=None, description="Cursor from a previous page's next_cursor"),
+) -> ORJSONResponse:
     """Search clinical trials using explicit filter parameters."""
+    if phase:
+        canonical_phase = canonicalize(PHASE_CANONICAL, phase)
+        if canonical_phase is None:
+            raise HTTPException(status_code=400, detail=f"Invalid phase: {phase}")
+        phase = canonical_phase
+    if status:
+        canonical_status = canonicalize(STATUS_CANONICAL, status)
+        if canonical_status is None:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        status = canonical_status
+    search_after = _parse_cursor(after)
     try:
         location_filter = None
         if location:
@@ -87,27 +236,30 @@ async def filter_trials(
             enrollment_max=enrollment_max,
             confidence=1.0,
         )
-        results, total = await es_service.search(entities, page, page_size)
-        return SearchResponse(
-            query_interpretation=entities,
-            results=results,
-            total=total,
-            page=page,
-            page_size=page_size,
+        results, total, next_cursor = await cached_search(
+            entities, page, page_size, search_after
+        )
+        return _search_response(
+            entities, results, total, page, page_size, next_cursor
         )
     except Exception as exc:
         logger.error("Filter search failed: %s", exc, exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@router.get("/suggest", response_model=SuggestionResponse)
+@router.get(
+    "/suggest",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": SuggestionResponse}},
+)
 async def get_suggestions(
     q: str = Query(..., min_length=2, description="Partial query text"),
-) -> SuggestionResponse:
+) -> ORJSONResponse:
     """Get type-ahead suggestions for partial query."""
     try:
         suggestions = await suggestion_service.get_suggestions(q)
-        return SuggestionResponse(suggestions=suggestions)
+        return ORJSONResponse(content={"suggestions": suggestions})
     except Exception as exc:
         logger.error("Suggestions failed for q='%s': %s", q, exc, exc_info=True)
         raise HTTPException(status_code=500, detail=str(exc))
@@ -0,0 +1,37 @@
+"""Shared Anthropic client for the LLM-backed services.
+
+Entity extraction and summary generation both talk to the Anthropic API.
+They share one AsyncAnthropic instance so requests reuse pooled
+keep-alive connections instead of opening a new one per call.
+"""
+
+from functools import lru_cache
+
+import anthropic
+import httpx
+
+from ..config import get_settings
+
+# Hard ceiling for one messages.create call, retries included; callers wrap
+# their request in asyncio.wait_for with this value.
+CALL_TIMEOUT = 20.0
+
+
+@lru_cache(maxsize=1)
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    settings = get_settings()
+    return anthropic.AsyncAnthropic(
+        api_key=settings.anthropic_api_key,
+        max_retries=1,
+        timeout=httpx.Timeout(connect=2.0, read=15.0, write=5.0, pool=2.0),
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        ),
+    )
+
+
+async def close_anthropic_client() -> None:
+    """Close the shared client's connection pool if one was created."""
+    if get_anthropic_client.cache_info().currsize:
+        await get_anthropic_client().close()
+        get_anthropic_client.cache_clear()
@@ -4,14 +4,29 @@ Converts ExtractedEntities into Elasticsearch Query DSL and executes
 searches against the clinical_trials index.
 """
 
+import asyncio
+import base64
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Final,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
-from elasticsearch import Elasticsearch
+import orjson
+from elasticsearch import AsyncElasticsearch
 
 from ..config import get_settings
 from ..models.entities import ExtractedEntities
-from ..models.schemas import AgeCategory, Facility, Sponsor, TrialResult
 
 logger = logging.getLogger(__name__)
 
@@ -35,176 +50,313 @@ _SOURCE_FIELDS = [
 ]
 
 
-class ElasticsearchService:
-    def __init__(self) -> None:
-        settings = get_settings()
-        self.es = Elasticsearch([settings.es_url])
-        self.index = settings.es_index
+# Serialized query for requests without filters.
+_MATCH_ALL: Final[bytes] = b'{"match_all":{}}'
 
-    def build_query(self, entities: ExtractedEntities) -> Dict[str, Any]:
-        """Build Elasticsearch query DSL from extracted entities."""
-        must_clauses: List[Dict[str, Any]] = []
-        filter_clauses: List[Dict[str, Any]] = []
+# ExtractedEntities fields that do not contribute to the query.
+_NON_FILTER_FIELDS: Final[FrozenSet[str]] = frozenset({"confidence", "clarification"})
 
-        # Phase - exact match filter
-        if entities.phase:
-            filter_clauses.append({"term": {"phase": entities.phase}})
+# Nested fields that the response contract always renders as lists.
+_LIST_FIELDS = ("sponsors", "facilities", "conditions", "age")
 
-        # Status - exact match filter
-        if entities.status:
-            filter_clauses.append({"term": {"overall_status": entities.status}})
+# nct_id is unique per trial, giving search_after a stable tiebreaker.
+_SORT = [{"_score": "desc"}, {"enrollment": "desc"}, {"nct_id": "asc"}]
 
-        # Condition - text match across title and description
-        if entities.condition:
-            must_clauses.append(
-                {
-                    "multi_match": {
-                        "query": entities.condition,
-                        "fields": [
-                            "brief_title^3",
-                            "official_title^2",
-                            "brief_summaries_description",
-                        ],
-                        "type": "best_fields",
-                        "fuzziness": "AUTO",
-                    }
-                }
-            )
 
-        # Keyword - multi-match with phrase_prefix
-        if entities.keyword:
-            must_clauses.append(
-                {
-                    "multi_match": {
-                        "query": entities.keyword,
-                        "fields": [
-                            "brief_title^2",
-                            "official_title^2",
-                            "brief_summaries_description",
-                            "detailed_description",
-                        ],
-                        "type": "phrase_prefix",
-                    }
+def encode_cursor(sort_values: List[Any]) -> str:
+    """Encode a hit's sort values as an opaque pagination cursor."""
+    raw = json.dumps(sort_values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        sort_values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (UnicodeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+    if not isinstance(sort_values, list) or len(sort_values) != len(_SORT):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return sort_values
+
+
+def _hit_to_result(source: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape an ES ``_source`` into a TrialResult-compatible dict.
+
+    Documents are normalized at ingest time, so the hit is passed through
+    without per-field model validation.
+    """
+    result = {field: source.get(field) for field in _SOURCE_FIELDS}
+    for field in _LIST_FIELDS:
+        result[field] = result[field] or []
+    result["facilities"] = result["facilities"][:3]
+    result["age"] = [a["age_category"] for a in result["age"]]
+    return result
+
+
+def _query_dsl(entities: ExtractedEntities) -> Dict[str, Any]:
+    """Build Elasticsearch query DSL from extracted entities (uncached)."""
+    must_clauses: List[Dict[str, Any]] = []
+    filter_clauses: List[Dict[str, Any]] = []
+
+    # Phase - exact match filter
+    if entities.phase:
+        filter_clauses.append({"term": {"phase": entities.phase}})
+
+    # Status - exact match filter
+    if entities.status:
+        filter_clauses.append({"term": {"overall_status": entities.status}})
+
+    # Condition - text match across title and description
+    if entities.condition:
+        must_clauses.append(
+            {
+                "multi_match": {
+                    "query": entities.condition,
+                    "fields": [
+                        "brief_title^3",
+                        "official_title^2",
+                        "brief_summaries_description",
+                    ],
+                    "type": "best_fields",
+                    "fuzziness": "AUTO",
                 }
-            )
+            }
+        )
 
-        # Location - nested query on facilities
-        if entities.location:
-            location_filters: List[Dict[str, Any]] = []
-            if entities.location.country:
-                location_filters.append(
-                    {"term": {"facilities.country": entities.location.country}}
-                )
-            if entities.location.state:
-                location_filters.append(
-                    {"term": {"facilities.state": entities.location.state}}
-                )
-            if entities.location.city:
-                location_filters.append(
-                    {"term": {"facilities.city": entities.location.city}}
-                )
-            if location_filters:
-                filter_clauses.append(
-                    {
-                        "nested": {
-                            "path": "facilities",
-                            "query": {"bool": {"must": location_filters}},
-                        }
-                    }
-                )
+    # Keyword - multi-match with phrase_prefix
+    if entities.keyword:
+        must_clauses.append(
+            {
+                "multi_match": {
+                    "query": entities.keyword,
+                    "fields": [
+                        "brief_title^2",
+                        "official_title^2",
+                        "brief_summaries_description",
+                        "detailed_description",
+                    ],
+                    "type": "phrase_prefix",
+                }
+            }
+        )
 
-        # Sponsor - nested query
-        if entities.sponsor:
+    # Location - nested query on facilities
+    if entities.location:
+        location_filters: List[Dict[str, Any]] = []
+        if entities.location.country:
+            location_filters.append(
+                {"term": {"facilities.country": entities.location.country}}
+            )
+        if entities.location.state:
+            location_filters.append(
+                {"term": {"facilities.state": entities.location.state}}
+            )
+        if entities.location.city:
+            location_filters.append(
+                {"term": {"facilities.city": entities.location.city}}
+            )
+        if location_filters:
             filter_clauses.append(
                 {
                     "nested": {
-                        "path": "sponsors",
-                        "query": {"match": {"sponsors.name": entities.sponsor}},
+                        "path": "facilities",
+                        "query": {"bool": {"must": location_filters}},
                     }
                 }
             )
 
-        # Age group - nested query
-        if entities.age_group:
-            filter_clauses.append(
-                {
-                    "nested": {
-                        "path": "age",
-                        "query": {"term": {"age.age_category": entities.age_group}},
-                    }
+    # Sponsor - nested query
+    if entities.sponsor:
+        filter_clauses.append(
+            {
+                "nested": {
+                    "path": "sponsors",
+                    "query": {"match": {"sponsors.name": entities.sponsor}},
                 }
-            )
+            }
+        )
 
-        # Enrollment range
-        if entities.enrollment_min is not None or entities.enrollment_max is not None:
-            range_query: Dict[str, int] = {}
-            if entities.enrollment_min is not None:
-                range_query["gte"] = entities.enrollment_min
-            if entities.enrollment_max is not None:
-                range_query["lte"] = entities.enrollment_max
-            filter_clauses.append({"range": {"enrollment": range_query}})
-
-        # Build final query
-        if not must_clauses and not filter_clauses:
-            return {"match_all": {}}
-
-        query: Dict[str, Any] = {"bool": {}}
-        if must_clauses:
-            query["bool"]["must"] = must_clauses
-        if filter_clauses:
-            query["bool"]["filter"] = filter_clauses
-        return query
+    # Age group - nested query
+    if entities.age_group:
+        filter_clauses.append(
+            {
+                "nested": {
+                    "path": "age",
+                    "query": {"term": {"age.age_category": entities.age_group}},
+                }
+            }
+        )
+
+    # Enrollment range
+    if entities.enrollment_min is not None or entities.enrollment_max is not None:
+        range_query: Dict[str, int] = {}
+        if entities.enrollment_min is not None:
+            range_query["gte"] = entities.enrollment_min
+        if entities.enrollment_max is not None:
+            range_query["lte"] = entities.enrollment_max
+        filter_clauses.append({"range": {"enrollment": range_query}})
+
+    # Build final query
+    if not must_clauses and not filter_clauses:
+        return {"match_all": {}}
+
+    query: Dict[str, Any] = {"bool": {}}
+    if must_clauses:
+        query["bool"]["must"] = must_clauses
+    if filter_clauses:
+        query["bool"]["filter"] = filter_clauses
+    return query
+
+
+# ExtractedEntities is frozen and hashable, and the query is a pure function
+# of it, so repeat filter combinations reuse the built DSL. It is cached in
+# serialized form so that each caller decodes its own mutable copy.
+@lru_cache(maxsize=4096)
+def _build_query(entities: ExtractedEntities) -> bytes:
+    if entities.model_fields_set <= _NON_FILTER_FIELDS:
+        return _MATCH_ALL
+    return orjson.dumps(_query_dsl(entities))
+
+
+class ElasticsearchService:
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.es = AsyncElasticsearch(
+            [settings.es_url],
+            http_compress=True,
+            connections_per_node=(os.cpu_count() or 1) * 4,
+            request_timeout=10,
+            retry_on_timeout=True,
+            max_retries=2,
+        )
+        self.index = settings.es_index
+        # Searches issued within this window are coalesced into one _msearch.
+        self.batch_window = settings.es_msearch_window_ms / 1000
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    async def msearch(self, bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run several search bodies against the index in one round-trip."""
+        searches: List[Dict[str, Any]] = []
+        for body in bodies:
+            searches.append({"index": self.index})
+            searches.append(body)
+        response = await self.es.msearch(searches=searches)
+        return response["responses"]
+
+    async def _execute(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a search body, batching it with concurrent searches if enabled."""
+        if self.batch_window <= 0:
+            return await self.es.search(index=self.index, body=body)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((body, future))
+        if len(self._pending) == 1:
+            loop.call_later(self.batch_window, self._schedule_flush)
+        return await future
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.create_task(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        try:
+            if len(batch) == 1:
+                responses = [await self.es.search(index=self.index, body=batch[0][0])]
+            else:
+                responses = await self.msearch([body for body, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), response in zip(batch, responses):
+            if future.done():
+                continue
+            if "error" in response:
+                future.set_exception(
+                    RuntimeError(f"Elasticsearch msearch item failed: {response['error']}")
+                )
+            else:
+                future.set_result(response)
+
+    def build_query(self, entities: ExtractedEntities) -> Dict[str, Any]:
+        """Build Elasticsearch query DSL from extracted entities.
+
+        Returns a fresh dict on every call; callers may modify it.
+        """
+        return orjson.loads(_build_query(entities))
+
+    def _search_body(
+        self,
+        entities: ExtractedEntities,
+        page: int,
+        page_size: int,
+        search_after: Optional[List[Any]],
+    ) -> Dict[str, Any]:
+        body: Dict[str, Any] = {
+            "query": self.build_query(entities),
+            "size": page_size,
+            "sort": _SORT,
+            "_source": _SOURCE_FIELDS,
+        }
+        if search_after is not None:
+            body["search_after"] = search_after
+        else:
+            body["from"] = (page - 1) * page_size
+        return body
 
     async def search(
         self,
         entities: ExtractedEntities,
         page: int = 1,
         page_size: int = 10,
-    ) -> tuple[List[TrialResult], int]:
-        """Execute search and return results with total count."""
-        query = self.build_query(entities)
-
-        response = self.es.search(
-            index=self.index,
-            body={
-                "query": query,
-                "from": (page - 1) * page_size,
-                "size": page_size,
-                "sort": [{"_score": "desc"}, {"enrollment": "desc"}],
-                "_source": _SOURCE_FIELDS,
-            },
-        )
+        search_after: Optional[List[Any]] = None,
+    ) -> tuple[List[Dict[str, Any]], int, Optional[str]]:
+        """Execute search and return results, total count and next-page cursor.
 
-        results: List[TrialResult] = []
-        for hit in response["hits"]["hits"]:
-            source = hit["_source"]
-            results.append(
-                TrialResult(
-                    nct_id=source["nct_id"],
-                    brief_title=source["brief_title"],
-                    official_title=source.get("official_title"),
-                    phase=source.get("phase"),
-                    overall_status=source.get("overall_status"),
-                    enrollment=source.get("enrollment"),
-                    sponsors=[Sponsor(**s) for s in source.get("sponsors", [])],
-                    facilities=[
-                        Facility(**f) for f in source.get("facilities", [])[:3]
-                    ],
-                    conditions=source.get("conditions", []),
-                    brief_summaries_description=source.get(
-                        "brief_summaries_description"
-                    ),
-                    start_date=source.get("start_date"),
-                    completion_date=source.get("completion_date"),
-                    age=[AgeCategory(**a) for a in source.get("age", [])],
-                    gender=source.get("gender"),
-                    study_type=source.get("study_type"),
-                    source=source.get("source"),
-                )
-            )
+        When ``search_after`` (decoded from a previous cursor) is given, ES
+        resumes after that hit instead of skipping ``(page - 1) * page_size``
+        documents, which keeps deep pages cheap.
+        """
+        body = self._search_body(entities, page, page_size, search_after)
+        response = await self._execute(body)
+        hits = response["hits"]["hits"]
+
+        results = [_hit_to_result(hit["_source"]) for hit in hits]
+
+        next_cursor = None
+        if len(hits) == page_size and "sort" in hits[-1]:
+            next_cursor = encode_cursor(hits[-1]["sort"])
 
         total = response["hits"]["total"]["value"]
-        return results, total
+        return results, total, next_cursor
+
+    async def search_iter(
+        self,
+        entities: ExtractedEntities,
+        page: int = 1,
+        page_size: int = 10,
+        search_after: Optional[List[Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one page of results one at a time.
+
+        Same query as :meth:`search`, but each hit is shaped only when the
+        consumer asks for it, so no second list of results is built.
+        """
+        body = self._search_body(entities, page, page_size, search_after)
+        response = await self._execute(body)
+        for hit in response["hits"]["hits"]:
+            yield _hit_to_result(hit["_source"])
 
 
 es_service = ElasticsearchService()
@@ -4,26 +4,32 @@ Uses the Anthropic Claude API to parse clinical trial search queries into
 structured filters matching the ExtractedEntities model.
 """
 
+import asyncio
 import json
 import logging
-import re
+from typing import Any, Optional
 
 import anthropic
+import orjson
 
 from ..config import get_settings
 from ..models.entities import ExtractedEntities, LocationFilter
+from .anthropic_client import CALL_TIMEOUT, get_anthropic_client
 from ..utils.synonyms import (
+    AGE_GROUP_CANONICAL,
     AGE_GROUP_SYNONYMS,
     LOCATION_NORMALIZATIONS,
+    PHASE_CANONICAL,
     PHASE_MAPPINGS,
+    STATUS_CANONICAL,
     STATUS_SYNONYMS,
-    VALID_AGE_GROUPS,
-    VALID_PHASES,
-    VALID_STATUSES,
+    canonicalize,
 )
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 
 def _build_system_prompt() -> str:
     """Build the system prompt with dynamic synonym sections."""
@@ -106,7 +112,24 @@ Rules:
 7. Always respond with valid JSON only. No markdown, no code fences, no explanations."""
 
 
-SYSTEM_PROMPT = _build_system_prompt()
+try:
+    # Pre-rendered by scripts/gen_prompt.py.
+    from ._system_prompt import SYSTEM_PROMPT
+except ImportError:  # pragma: no cover - generated file missing
+    SYSTEM_PROMPT = _build_system_prompt()
+
+# Built once and passed by reference on every call. The prompt is identical
+# across requests, so it is marked as an Anthropic prompt-cache breakpoint.
+_SYSTEM_BLOCK = [
+    {
+        "type": "text",
+        "text": SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+
+_DECODER = json.JSONDecoder()
 
 
 def _parse_json_response(text: str) -> dict:
@@ -114,37 +137,48 @@ def _parse_json_response(text: str) -> dict:
     text = text.strip()
 
     # Try direct parse first
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+    if text.startswith("{"):
+        try:
+            return orjson.loads(text)
+        except json.JSONDecodeError:
+            pass
+
+    # Otherwise decode the object at the first brace (also covers ```json
+    # fences and surrounding prose); raw_decode stops at the object's end.
+    start = text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object found in response", text, 0)
+    data, _ = _DECODER.raw_decode(text, start)
+    return data
 
-    # Try extracting JSON from markdown code fences
-    match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
-    if match:
-        return json.loads(match.group(1))
 
-    # Try finding the first { ... } block (supports one level of nesting)
-    match = re.search(r"\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}", text, re.DOTALL)
-    if match:
-        return json.loads(match.group(0))
+# Enum-valued fields and their value -> canonical value tables.
+_ENUM_FIELDS = (
+    ("phase", PHASE_CANONICAL),
+    ("status", STATUS_CANONICAL),
+    ("age_group", AGE_GROUP_CANONICAL),
+)
+
 
-    raise json.JSONDecodeError("No JSON object found in response", text, 0)
+def _maybe_int(value: Any) -> Optional[int]:
+    """Coerce an LLM-supplied number to int, or None if it isn't one."""
+    # JSON integers already arrive as int; only strings/floats need int().
+    if type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def _validate_and_normalize(data: dict) -> dict:
     """Validate and normalize LLM output against known enum values."""
-    if data.get("phase") and data["phase"] not in VALID_PHASES:
-        logger.warning("LLM returned invalid phase: %s", data["phase"])
-        data["phase"] = None
-
-    if data.get("status") and data["status"] not in VALID_STATUSES:
-        logger.warning("LLM returned invalid status: %s", data["status"])
-        data["status"] = None
-
-    if data.get("age_group") and data["age_group"] not in VALID_AGE_GROUPS:
-        logger.warning("LLM returned invalid age_group: %s", data["age_group"])
-        data["age_group"] = None
+    for field, canonical in _ENUM_FIELDS:
+        value = data.get(field)
+        if value:
+            data[field] = canonicalize(canonical, value)
+            if data[field] is None:
+                logger.warning("LLM returned invalid %s: %s", field, value)
 
     if "confidence" in data:
         data["confidence"] = max(0.0, min(1.0, float(data["confidence"])))
@@ -160,14 +194,18 @@ def _validate_and_normalize(data: dict) -> dict:
     for field in ("enrollment_min", "enrollment_max"):
         val = data.get(field)
         if val is not None:
-            try:
-                data[field] = int(val)
-            except (TypeError, ValueError):
-                data[field] = None
+            data[field] = _maybe_int(val)
 
     return data
 
 
+# ExtractedEntities is frozen, so blank queries can share one answer.
+_EMPTY_QUERY_RESULT = ExtractedEntities(
+    confidence=0.1,
+    clarification="Please enter a search query about clinical trials.",
+)
+
+
 async def extract_entities(query: str) -> ExtractedEntities:
     """Extract structured entities from a natural language clinical trials query.
 
@@ -178,29 +216,29 @@ async def extract_entities(query: str) -> ExtractedEntities:
         ExtractedEntities with extracted filters, confidence score,
         and optional clarification question.
     """
-    if not query or not query.strip():
-        return ExtractedEntities(
-            confidence=0.1,
-            clarification="Please enter a search query about clinical trials.",
-        )
+    query = query.strip() if query else ""
+    if not query:
+        return _EMPTY_QUERY_RESULT
 
-    settings = get_settings()
-    client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    client = get_anthropic_client()
 
     try:
-        message = await client.messages.create(
-            model=settings.claude_model,
-            max_tokens=1024,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        "Extract entities from this clinical trials "
-                        f'search query: "{query.strip()}"'
-                    ),
-                }
-            ],
+        message = await asyncio.wait_for(
+            client.messages.create(
+                model=settings.claude_model,
+                max_tokens=1024,
+                system=_SYSTEM_BLOCK,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": (
+                            "Extract entities from this clinical trials "
+                            f'search query: "{query}"'
+                        ),
+                    }
+                ],
+            ),
+            timeout=CALL_TIMEOUT,
         )
 
         response_text = message.content[0].text
@@ -211,14 +249,14 @@ async def extract_entities(query: str) -> ExtractedEntities:
 
         return ExtractedEntities(**data)
 
-    except json.JSONDecodeError as exc:
+    except json.JSONDecodeError as exc:  # also raised by orjson
         logger.warning("Failed to parse LLM JSON response: %s", exc)
         return ExtractedEntities(
             confidence=0.3,
             clarification="I had trouble understanding your query. Could you rephrase it?",
         )
-    except anthropic.APIError as exc:
-        logger.error("Anthropic API error: %s", exc)
+    except (anthropic.APIError, asyncio.TimeoutError) as exc:
+        logger.error("Anthropic API error: %r", exc)
         return ExtractedEntities(
             confidence=0.0,
             clarification="The search service is temporarily unavailable. Please try again.",
@@ -1,16 +1,19 @@
 """Auto-suggestion service using Elasticsearch search_as_you_type fields."""
 
 import logging
-from typing import List
-
-from elasticsearch import Elasticsearch
+from bisect import bisect_left
+from typing import Any, Dict, List
 
 from ..config import get_settings
+from ..utils.cache import AsyncTTLCache
+from .es_service import es_service
 
 logger = logging.getLogger(__name__)
 
 MIN_PREFIX_LENGTH = 2
 DEFAULT_LIMIT = 10
+SUGGEST_TIMEOUT = 2.0  # seconds; a stale type-ahead answer is worthless
+SUGGEST_CACHE_TTL = 60.0  # seconds
 
 COMMON_CONDITIONS = [
     "Breast Cancer",
@@ -26,12 +29,52 @@ COMMON_CONDITIONS = [
     "Multiple Sclerosis",
 ]
 
+# (lowercased, original) pairs sorted by the lowercased name, so a prefix
+# match is a contiguous run that bisect can find directly.
+_COMMON_LOWER = sorted((c.lower(), c) for c in COMMON_CONDITIONS)
+_COMMON_KEYS = [lower for lower, _ in _COMMON_LOWER]
+
+
+# search_as_you_type subfields for the primary query; the plain title fields
+# back the phrase_prefix fallback.
+_AS_YOU_TYPE_FIELDS = [
+    "brief_title.suggest",
+    "brief_title.suggest._2gram",
+    "brief_title.suggest._3gram",
+    "official_title.suggest",
+    "official_title.suggest._2gram",
+    "official_title.suggest._3gram",
+]
+_TITLE_FIELDS = ["brief_title", "official_title"]
+
+
+def _unique_titles(response: Dict[str, Any]) -> List[str]:
+    """Brief titles from one _msearch item, de-duplicated case-insensitively."""
+    if "error" in response:
+        logger.warning("Suggestion query failed: %s", response["error"])
+        return []
+
+    # Keyed by casefolded title; the first spelling seen wins and insertion
+    # order keeps ES's ranking.
+    unique: Dict[str, str] = {}
+    for hit in response["hits"]["hits"]:
+        title = hit["_source"].get("brief_title", "")
+        if title:
+            unique.setdefault(title.casefold(), title)
+    return list(unique.values())
+
 
 class SuggestionService:
     def __init__(self) -> None:
         settings = get_settings()
-        self.es = Elasticsearch([settings.es_url])
+        # Shares the search service's connection pool, with a tighter timeout.
+        self.es = es_service.es.options(request_timeout=SUGGEST_TIMEOUT)
         self.index = settings.es_index
+        # Repeat keystrokes (backspacing, several users typing the same
+        # prefix) are answered without another ES round trip.
+        self._cache: AsyncTTLCache[List[str]] = AsyncTTLCache(
+            maxsize=1024, ttl=SUGGEST_CACHE_TTL
+        )
 
     async def get_suggestions(
         self, prefix: str, limit: int = DEFAULT_LIMIT
@@ -40,61 +83,51 @@ class SuggestionService:
             return []
 
         prefix = prefix.strip()
+        # Empty results aren't cached: they may come from a failed query.
+        return await self._cache.get_or_set(
+            (prefix.casefold(), limit),
+            lambda: self._search_suggestions(prefix, limit),
+            cache_if=bool,
+        )
 
-        response = self.es.search(
+    async def _search_suggestions(self, prefix: str, limit: int) -> List[str]:
+        # Primary (search_as_you_type) and fallback (phrase_prefix) queries
+        # go out in one _msearch round-trip; the fallback hits are only used
+        # when the primary query finds nothing.
+        response = await self.es.msearch(
             index=self.index,
-            body={
-                "size": limit,
-                "query": {
-                    "multi_match": {
-                        "query": prefix,
-                        "type": "bool_prefix",
-                        "fields": [
-                            "brief_title.suggest",
-                            "brief_title.suggest._2gram",
-                            "brief_title.suggest._3gram",
-                            "official_title.suggest",
-                            "official_title.suggest._2gram",
-                            "official_title.suggest._3gram",
-                        ],
-                    }
+            searches=[
+                {},
+                {
+                    "size": limit,
+                    "query": {
+                        "multi_match": {
+                            "query": prefix,
+                            "type": "bool_prefix",
+                            "fields": _AS_YOU_TYPE_FIELDS,
+                        }
+                    },
+                    "_source": ["brief_title"],
                 },
-                "_source": ["brief_title"],
-            },
-        )
-
-        suggestions: List[str] = []
-        seen: set = set()
-
-        for hit in response["hits"]["hits"]:
-            title = hit["_source"].get("brief_title", "")
-            key = title.lower()
-            if key and key not in seen:
-                seen.add(key)
-                suggestions.append(title)
-
-        if not suggestions:
-            fallback = self.es.search(
-                index=self.index,
-                body={
+                {},
+                {
                     "size": limit,
                     "query": {
                         "multi_match": {
                             "query": prefix,
                             "type": "phrase_prefix",
-                            "fields": ["brief_title", "official_title"],
+                            "fields": _TITLE_FIELDS,
                         }
                     },
                     "_source": ["brief_title"],
                 },
-            )
+            ],
+        )
+        primary, fallback = response["responses"]
 
-            for hit in fallback["hits"]["hits"]:
-                title = hit["_source"].get("brief_title", "")
-                key = title.lower()
-                if key and key not in seen:
-                    seen.add(key)
-                    suggestions.append(title)
+        suggestions = _unique_titles(primary)
+        if not suggestions:
+            suggestions = _unique_titles(fallback)
 
         return suggestions[:limit]
 
@@ -103,8 +136,16 @@ class SuggestionService:
             return []
 
         prefix_lower = prefix.strip().lower()
-        matching = [c for c in COMMON_CONDITIONS if c.lower().startswith(prefix_lower)]
-        return matching[:5]
+        matching: List[str] = []
+        i = bisect_left(_COMMON_KEYS, prefix_lower)
+        while (
+            i < len(_COMMON_KEYS)
+            and len(matching) < 5
+            and _COMMON_KEYS[i].startswith(prefix_lower)
+        ):
+            matching.append(_COMMON_LOWER[i][1])
+            i += 1
+        return matching
 
 
 suggestion_service = SuggestionService()
@@ -1,15 +1,19 @@
 """Service for generating AI-powered summaries of clinical trial search results."""
 
+import asyncio
 import logging
-from typing import List, Optional
+from itertools import chain
+from typing import Any, Dict, List, Optional
 
 import anthropic
 
 from ..config import get_settings
-from ..models.schemas import TrialResult
+from .anthropic_client import CALL_TIMEOUT, get_anthropic_client
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 SUMMARY_SYSTEM_PROMPT = """You are a clinical trials research assistant. Synthesize the provided clinical trial results into a concise overview.
 
 Rules:
@@ -22,13 +26,43 @@ Rules:
 7. Output plain text only - no markdown formatting"""
 
 
+_TRIAL_TEMPLATE = (
+    "[{index}] {brief_title}\n"
+    "    NCT ID: {nct_id}\n"
+    "    Phase: {phase}\n"
+    "    Status: {status}\n"
+    "    Conditions: {conditions}\n"
+    "    Sponsor: {sponsor}\n"
+    "    Enrollment: {enrollment}"
+)
+
+
+def _format_trial(index: int, trial: Dict[str, Any]) -> str:
+    """Render one result as a numbered block of the summary prompt."""
+    conditions = ", ".join(
+        filter(None, chain.from_iterable(c.values() for c in trial["conditions"]))
+    )[:200]
+    sponsors = trial["sponsors"]
+    return _TRIAL_TEMPLATE.format_map({
+        "index": index,
+        "brief_title": trial["brief_title"],
+        "nct_id": trial["nct_id"],
+        "phase": trial["phase"] or "N/A",
+        "status": trial["overall_status"] or "N/A",
+        "conditions": conditions or "N/A",
+        "sponsor": sponsors[0]["name"] if sponsors else "Unknown",
+        "enrollment": trial["enrollment"] or "N/A",
+    })
+
+
 async def generate_summary(
-    results: List[TrialResult], query: str
+    results: List[Dict[str, Any]], query: str
 ) -> Optional[str]:
     """Generate an AI summary of search results with citations.
 
     Args:
-        results: List of trial results to summarize (uses first 10).
+        results: Trial result dicts, as returned by the ES service, to
+            summarize (uses first 10).
         query: The original search query for context.
 
     Returns:
@@ -37,49 +71,55 @@ async def generate_summary(
     if not results:
         return None
 
-    settings = get_settings()
     if not settings.anthropic_api_key:
         logger.warning("No Anthropic API key configured, skipping summary generation")
         return None
 
-    trials_context = []
-    for i, trial in enumerate(results[:10], start=1):
-        conditions = ", ".join(
-            val for c in trial.conditions for val in c.values() if val
-        )[:200]
-        sponsor = trial.sponsors[0].name if trial.sponsors else "Unknown"
-        trials_context.append(
-            f"[{i}] {trial.brief_title}\n"
-            f"    NCT ID: {trial.nct_id}\n"
-            f"    Phase: {trial.phase or 'N/A'}\n"
-            f"    Status: {trial.overall_status or 'N/A'}\n"
-            f"    Conditions: {conditions or 'N/A'}\n"
-            f"    Sponsor: {sponsor}\n"
-            f"    Enrollment: {trial.enrollment or 'N/A'}"
-        )
-
-    context_text = "\n\n".join(trials_context)
-    client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    context_text = "\n\n".join(
+        _format_trial(i, trial) for i, trial in enumerate(results[:10], start=1)
+    )
+    client = get_anthropic_client()
 
     try:
-        message = await client.messages.create(
-            model=settings.claude_model,
-            max_tokens=500,
-            system=SUMMARY_SYSTEM_PROMPT,
-            messages=[
-                {
-                    "role": "user",
-                    "content": (
-                        f'Search query: "{query}"\n\n'
-                        f"Clinical trials found:\n\n{context_text}\n\n"
-                        "Provide a brief summary with citations."
-                    ),
-                }
-            ],
+        # The system prompt and the trials block are marked as prompt-cache
+        # breakpoints; only the short query tail differs between requests
+        # summarizing the same page.
+        message = await asyncio.wait_for(
+            client.messages.create(
+                model=settings.claude_model,
+                max_tokens=500,
+                system=[
+                    {
+                        "type": "text",
+                        "text": SUMMARY_SYSTEM_PROMPT,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": f"Clinical trials found:\n\n{context_text}",
+                                "cache_control": {"type": "ephemeral"},
+                            },
+                            {
+                                "type": "text",
+                                "text": (
+                                    f'Search query: "{query}"\n\n'
+                                    "Provide a brief summary with citations."
+                                ),
+                            },
+                        ],
+                    }
+                ],
+            ),
+            timeout=CALL_TIMEOUT,
         )
         return message.content[0].text.strip()
-    except anthropic.APIError as exc:
-        logger.error("Summary generation API error: %s", exc)
+    except (anthropic.APIError, asyncio.TimeoutError) as exc:
+        logger.error("Summary generation API error: %r", exc)
         return None
     except Exception as exc:
         logger.error("Unexpected error generating summary: %s", exc, exc_info=True)
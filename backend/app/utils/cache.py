@@ -0,0 +1,169 @@
+"""In-process async result cache with TTL and stale-while-revalidate.
+
+Used to memoize expensive coroutine results (LLM entity extraction,
+Elasticsearch searches) for repeated queries.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Generic,
+    Hashable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Filler words that never change which entities a search query maps to when
+# they lead the query ("show me trials for ..."). Negations and "or" are
+# deliberately absent: they do change the meaning.
+_FILLER_WORDS: FrozenSet[str] = frozenset({
+    "a", "an", "and", "the", "for", "of", "on", "in", "at", "to", "with",
+    "show", "me", "find", "search", "clinical", "trial", "trials",
+    "study", "studies",
+})
+
+
+class AsyncTTLCache(Generic[T]):
+    """Bounded LRU cache for coroutine results.
+
+    Entries younger than ``ttl`` seconds are served directly. Entries older
+    than ``ttl`` but younger than ``ttl + stale_ttl`` are served stale while
+    a background task refreshes them. Anything older is a miss. Concurrent
+    misses for the same key share a single factory call.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, Tuple[T, float]]" = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _store(self, key: Hashable, value: T) -> None:
+        self._entries[key] = (value, self._timer())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def _load(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[T]],
+        cache_if: Optional[Callable[[T], bool]],
+    ) -> T:
+        value = await factory()
+        if cache_if is None or cache_if(value):
+            self._store(key, value)
+        return value
+
+    def _load_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        if not task.cancelled():
+            task.exception()  # waiters re-raise it; don't log it as unretrieved
+
+    async def _refresh(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[T]],
+        cache_if: Optional[Callable[[T], bool]],
+    ) -> None:
+        try:
+            value = await factory()
+            if cache_if is None or cache_if(value):
+                self._store(key, value)
+        except Exception as exc:
+            logger.warning("Background cache refresh failed for %r: %s", key, exc)
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[T]],
+        cache_if: Optional[Callable[[T], bool]] = None,
+    ) -> T:
+        """Return the cached value for ``key``, calling ``factory`` on a miss.
+
+        Args:
+            key: Hashable cache key.
+            factory: Zero-argument callable returning the awaitable to cache.
+            cache_if: Optional predicate; results it rejects are returned
+                but not stored (e.g. error fallbacks).
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = self._timer() - stored_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                if key not in self._refreshing:
+                    task = asyncio.create_task(self._refresh(key, factory, cache_if))
+                    self._refreshing[key] = task
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return value
+            del self._entries[key]
+
+        # Single flight: the first miss starts the load and later callers
+        # await the same task. It is shielded so one caller being cancelled
+        # doesn't cancel the load for the others.
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, factory, cache_if))
+            self._loading[key] = task
+            task.add_done_callback(functools.partial(self._load_done, key))
+        return await asyncio.shield(task)
+
+
+def normalize_query(query: str) -> str:
+    """Canonical cache key for a free-text query (case/whitespace-insensitive)."""
+    return " ".join(query.lower().split())
+
+
+def query_signature(query: str) -> str:
+    """Paraphrase-tolerant cache key for a free-text query.
+
+    Lowercases, collapses whitespace, drops surrounding punctuation and
+    strips leading filler words, so "Show me phase 2 asthma trials" and
+    "phase 2 asthma trials?" share one key. Token order and repeats are
+    kept: "phase 2 not phase 3" and "phase 3 not phase 2" mean different
+    things and must not collide.
+    """
+    tokens = [token.strip(".,;:!?\"'()") for token in normalize_query(query).split()]
+    tokens = [t for t in tokens if t]
+    start = 0
+    while start < len(tokens) and tokens[start] in _FILLER_WORDS:
+        start += 1
+    return " ".join(tokens[start:] or tokens)
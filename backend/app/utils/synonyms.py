@@ -81,3 +81,21 @@ VALID_STATUSES = frozenset([
 VALID_AGE_GROUPS = frozenset([
     "adult", "older-adults", "child", "adolescent", "infant", "toddler",
 ])
+
+
+def _canonical_map(values: frozenset[str]) -> dict[str, str]:
+    """Map each valid value's casefolded spelling to the value itself."""
+    return {value.casefold(): value for value in values}
+
+
+def canonicalize(canonical: dict[str, str], value: object) -> str | None:
+    """Canonical spelling of ``value`` in any letter case, or None if invalid."""
+    return canonical.get(value.casefold()) if isinstance(value, str) else None
+
+
+# Server-side normalization of LLM output and /filter parameters: one
+# casefolded lookup yields the canonical value, or None for anything
+# outside the valid set.
+PHASE_CANONICAL = _canonical_map(VALID_PHASES)
+STATUS_CANONICAL = _canonical_map(VALID_STATUSES)
+AGE_GROUP_CANONICAL = _canonical_map(VALID_AGE_GROUPS)
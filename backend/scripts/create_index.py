@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from elasticsearch import Elasticsearch
 from app.config import get_settings
+from app.resources import load_es_mappings
 
 logger = logging.getLogger(__name__)
 
@@ -29,161 +30,14 @@ INDEX_SETTINGS = {
     },
 }
 
-INDEX_MAPPINGS = {
-    "dynamic": False,
-    "properties": {
-        # Keyword fields
-        "nct_id": {"type": "keyword"},
-        "phase": {"type": "keyword"},
-        "overall_status": {"type": "keyword"},
-        "gender": {"type": "keyword"},
-        "study_type": {"type": "keyword"},
-        "intervention_model": {"type": "keyword"},
-        "primary_purpose": {"type": "keyword"},
-        "source": {"type": "keyword"},
-        "acronym": {"type": "keyword"},
-        "allocation": {"type": "keyword"},
-        "masking": {"type": "keyword"},
-        "minimum_age": {"type": "keyword"},
-        "maximum_age": {"type": "keyword"},
-        # Text fields with clinical_analyzer
-        "brief_title": {
-            "type": "text",
-            "analyzer": "clinical_analyzer",
-            "fields": {
-                "suggest": {"type": "search_as_you_type"},
-                "keyword": {"type": "keyword", "ignore_above": 512},
-            },
-        },
-        "official_title": {
-            "type": "text",
-            "analyzer": "clinical_analyzer",
-            "fields": {
-                "suggest": {"type": "search_as_you_type"},
-                "keyword": {"type": "keyword", "ignore_above": 512},
-            },
-        },
-        "brief_summaries_description": {
-            "type": "text",
-            "analyzer": "clinical_analyzer",
-        },
-        "detailed_description": {
-            "type": "text",
-            "analyzer": "clinical_analyzer",
-        },
-        # Numeric fields
-        "enrollment": {"type": "integer"},
-        # Date fields
-        "start_date": {"type": "date"},
-        "completion_date": {"type": "date"},
-        "primary_completion_date": {"type": "date"},
-        # Boolean fields
-        "healthy_volunteers": {"type": "boolean"},
-        "has_results": {"type": "boolean"},
-        # Nested: sponsors
-        "sponsors": {
-            "type": "nested",
-            "properties": {
-                "name": {
-                    "type": "text",
-                    "fields": {"keyword": {"type": "keyword"}},
-                },
-                "agency_class": {"type": "keyword"},
-                "lead_or_collaborator": {"type": "keyword"},
-            },
-        },
-        # Nested: facilities
-        "facilities": {
-            "type": "nested",
-            "properties": {
-                "name": {"type": "text"},
-                "city": {"type": "keyword"},
-                "state": {"type": "keyword"},
-                "zip": {"type": "keyword"},
-                "country": {"type": "keyword"},
-                "status": {"type": "keyword"},
-            },
-        },
-        # Nested: design_outcomes
-        "design_outcomes": {
-            "type": "nested",
-            "properties": {
-                "outcome_type": {"type": "keyword"},
-                "measure": {"type": "text", "analyzer": "clinical_analyzer"},
-                "time_frame": {"type": "text"},
-                "description": {"type": "text", "analyzer": "clinical_analyzer"},
-            },
-        },
-        # Nested: age
-        "age": {
-            "type": "nested",
-            "properties": {
-                "age_category": {"type": "keyword"},
-            },
-        },
-        # Nested: conditions
-        "conditions": {
-            "type": "nested",
-            "properties": {
-                "name": {
-                    "type": "text",
-                    "analyzer": "clinical_analyzer",
-                    "fields": {"keyword": {"type": "keyword"}},
-                },
-            },
-        },
-        # Nested: interventions
-        "interventions": {
-            "type": "nested",
-            "properties": {
-                "intervention_type": {"type": "keyword"},
-                "name": {
-                    "type": "text",
-                    "analyzer": "clinical_analyzer",
-                    "fields": {"keyword": {"type": "keyword"}},
-                },
-                "description": {"type": "text", "analyzer": "clinical_analyzer"},
-            },
-        },
-        # Nested: keywords
-        "keywords": {
-            "type": "nested",
-            "properties": {
-                "name": {
-                    "type": "text",
-                    "fields": {"keyword": {"type": "keyword"}},
-                },
-            },
-        },
-        # Nested: browse_conditions (MeSH terms)
-        "browse_conditions": {
-            "type": "nested",
-            "properties": {
-                "mesh_term": {
-                    "type": "text",
-                    "analyzer": "clinical_analyzer",
-                    "fields": {"keyword": {"type": "keyword"}},
-                },
-            },
-        },
-        # Nested: browse_interventions (MeSH terms)
-        "browse_interventions": {
-            "type": "nested",
-            "properties": {
-                "mesh_term": {
-                    "type": "text",
-                    "analyzer": "clinical_analyzer",
-                    "fields": {"keyword": {"type": "keyword"}},
-                },
-            },
-        },
-    },
-}
+# Shared with scripts/ingest.py, which derives its per-field transforms
+# from the mapped types.
+INDEX_MAPPINGS = load_es_mappings()
 
 
 def create_index(delete_existing: bool = True) -> None:
     settings = get_settings()
-    es = Elasticsearch(settings.es_url)
+    es = Elasticsearch(settings.es_url, http_compress=True)
     index_name = settings.es_index
 
     if es.indices.exists(index=index_name):
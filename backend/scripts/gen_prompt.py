@@ -0,0 +1,53 @@
+"""Pre-render the LLM system prompt into app/services/_system_prompt.py.
+
+The prompt is built from the synonym tables in app.utils.synonyms, which
+only change between deploys. Rendering it once here lets llm_service load
+a string literal at import instead of rebuilding it.
+
+Re-run after editing synonyms.py or the prompt template
+(tests/test_llm_service.py fails while the generated file is stale).
+
+Usage:
+    cd backend && python -m scripts.gen_prompt
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.llm_service import _build_system_prompt
+
+OUTPUT_PATH = (
+    Path(__file__).resolve().parent.parent / "app" / "services" / "_system_prompt.py"
+)
+
+# Every extraction call sends the prompt; growth past this is a review
+# decision, not something to slip in with a synonym-table edit.
+MAX_PROMPT_BYTES = 8 * 1024
+
+HEADER = '''"""Generated by scripts/gen_prompt.py -- do not edit by hand."""
+
+'''
+
+
+def main() -> None:
+    prompt = _build_system_prompt()
+    size = len(prompt.encode("utf-8"))
+    if size > MAX_PROMPT_BYTES:
+        sys.exit(
+            f"System prompt is {size} bytes, over MAX_PROMPT_BYTES "
+            f"({MAX_PROMPT_BYTES}); not writing {OUTPUT_PATH}"
+        )
+    # One literal per prompt line keeps the generated file diffable.
+    lines = "".join(
+        f"    {line!r}\n" for line in prompt.splitlines(keepends=True)
+    )
+    OUTPUT_PATH.write_text(
+        f"{HEADER}SYSTEM_PROMPT = (\n{lines})\n", encoding="utf-8"
+    )
+    print(f"Wrote {OUTPUT_PATH} ({len(prompt)} chars)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,38 +5,36 @@ Usage:
 """
 
 import argparse
-import json
 import logging
+import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+import ijson
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk, BulkIndexError
+from elasticsearch.helpers import parallel_bulk, BulkIndexError
 from app.config import get_settings
+from app.resources import load_es_mappings
 
 logger = logging.getLogger(__name__)
 
-_NONE_STRINGS = {"None", "NA", "N/A", ""}
+_NONE_STRINGS = frozenset({"None", "NA", "N/A", ""})
 
 
 def _clean_string(value: Any) -> Optional[str]:
-    """Convert 'None'/'NA' sentinel strings to None."""
-    if value is None:
-        return None
-    if isinstance(value, str) and value.strip() in _NONE_STRINGS:
-        return None
-    return str(value)
+    """Convert 'None'/'NA' sentinel strings to None; strip the rest."""
+    if not isinstance(value, str):
+        return None if value is None else str(value)
+    stripped = value.strip()
+    return None if not stripped or stripped in _NONE_STRINGS else stripped
 
 
 def _parse_enrollment(value: Any) -> Optional[int]:
     """Convert enrollment string to int. Returns None for invalid values."""
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return int(value)
+    # Source data carries enrollment as strings, so that branch comes first.
     if isinstance(value, str):
         cleaned = value.strip()
         if cleaned in _NONE_STRINGS:
@@ -46,76 +44,73 @@ def _parse_enrollment(value: Any) -> Optional[int]:
         except ValueError:
             logger.warning("Invalid enrollment value: %r", value)
             return None
+    if isinstance(value, (int, float)):
+        return int(value)
     return None
 
 
+_BOOLEAN_STRINGS = {
+    "true": True, "yes": True, "1": True,
+    "false": False, "no": False, "0": False,
+}
+
+
 def _parse_boolean(value: Any) -> Optional[bool]:
     """Convert various boolean representations to bool or None."""
-    if value is None:
-        return None
+    # bool is checked first: it is the common case and a subclass of int.
     if isinstance(value, bool):
         return value
+    if isinstance(value, str):
+        return _BOOLEAN_STRINGS.get(value.strip().lower())
     if isinstance(value, (int, float)):
         return bool(value)
-    if isinstance(value, str):
-        lower = value.strip().lower()
-        if lower in ("true", "yes", "1"):
-            return True
-        if lower in ("false", "no", "0"):
-            return False
-        return None
     return None
 
 
+def _clean_text(value: Any) -> Any:
+    """Null out sentinel strings in free-text fields, keeping text as-is."""
+    if isinstance(value, str) and value.strip() in _NONE_STRINGS:
+        return None
+    return value
+
+
+def _pass_through(value: Any) -> Any:
+    return value
+
+
+def _ensure_list(value: Any) -> List[Any]:
+    return value or []
+
+
+# Cleaning function per ES mapping type: keyword -> sentinel-cleaned string,
+# integer -> int (enrollment), date -> ISO string as-is, nested -> list.
+_TYPE_TRANSFORMS: Dict[str, Callable[[Any], Any]] = {
+    "keyword": _clean_string,
+    "text": _clean_text,
+    "integer": _parse_enrollment,
+    "date": _pass_through,
+    "boolean": _parse_boolean,
+    "nested": _ensure_list,
+}
+
+_FIELD_TRANSFORMS: Tuple[Tuple[str, Callable[[Any], Any]], ...] = tuple(
+    (field, _TYPE_TRANSFORMS[spec["type"]])
+    for field, spec in load_es_mappings()["properties"].items()
+)
+
+
 def transform_document(doc: Dict[str, Any]) -> Dict[str, Any]:
-    """Transform a raw JSON document for ES indexing."""
-    transformed: Dict[str, Any] = {}
-
-    # Keyword fields (clean NA -> None)
-    for field in [
-        "nct_id", "phase", "overall_status", "gender", "study_type",
-        "intervention_model", "primary_purpose", "source", "acronym",
-        "allocation", "masking", "minimum_age", "maximum_age",
-    ]:
-        transformed[field] = _clean_string(doc.get(field))
-
-    # Text fields
-    for field in [
-        "brief_title", "official_title",
-        "brief_summaries_description", "detailed_description",
-    ]:
-        val = doc.get(field)
-        if isinstance(val, str) and val.strip() in _NONE_STRINGS:
-            transformed[field] = None
-        else:
-            transformed[field] = val
-
-    # Enrollment: string -> int
-    transformed["enrollment"] = _parse_enrollment(doc.get("enrollment"))
-
-    # Date fields: pass through ISO strings
-    for field in ["start_date", "completion_date", "primary_completion_date"]:
-        transformed[field] = doc.get(field)
-
-    # Boolean fields
-    transformed["healthy_volunteers"] = _parse_boolean(doc.get("healthy_volunteers"))
-    transformed["has_results"] = _parse_boolean(doc.get("has_results"))
-
-    # Nested arrays (ensure always list)
-    for field in [
-        "sponsors", "facilities", "design_outcomes", "age",
-        "conditions", "interventions", "keywords",
-        "browse_conditions", "browse_interventions",
-    ]:
-        transformed[field] = doc.get(field) or []
-
-    return transformed
+    """Transform a raw JSON document for ES indexing.
+
+    Every mapped field is cleaned according to its type in es_mappings.json.
+    """
+    return {field: transform(doc.get(field)) for field, transform in _FIELD_TRANSFORMS}
 
 
 def generate_bulk_actions(
-    data: List[Dict], index_name: str
+    data: Iterable[Dict[str, Any]], index_name: str
 ) -> Generator[Dict[str, Any], None, None]:
-    """Yield bulk action dicts for elasticsearch.helpers.bulk()."""
+    """Yield bulk action dicts for elasticsearch.helpers.parallel_bulk()."""
     for doc in data:
         transformed = transform_document(doc)
         nct_id = transformed.get("nct_id")
@@ -129,10 +124,27 @@ def generate_bulk_actions(
         }
 
 
-def ingest_data(filepath: str) -> None:
-    """Load JSON file and bulk-index into Elasticsearch."""
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_MAX_CHUNK_MB = 20
+BULK_REQUEST_TIMEOUT = 120  # seconds per _bulk request
+
+
+def ingest_data(
+    filepath: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_chunk_mb: int = DEFAULT_MAX_CHUNK_MB,
+) -> None:
+    """Stream the JSON file and bulk-index it into Elasticsearch."""
     settings = get_settings()
-    es = Elasticsearch(settings.es_url)
+    thread_count = os.cpu_count() or 1
+    # One pooled connection per bulk worker thread; gzip request bodies.
+    es = Elasticsearch(
+        settings.es_url,
+        connections_per_node=thread_count,
+        http_compress=True,
+        request_timeout=60,
+        retry_on_timeout=True,
+    )
     index_name = settings.es_index
 
     if not es.indices.exists(index=index_name):
@@ -141,28 +153,37 @@ def ingest_data(filepath: str) -> None:
         )
         sys.exit(1)
 
-    logger.info("Loading data from %s", filepath)
-    with open(filepath, "r") as f:
-        data = json.load(f)
-    logger.info("Loaded %d documents", len(data))
-
-    try:
-        success, errors = bulk(
-            es,
-            generate_bulk_actions(data, index_name),
-            raise_on_error=False,
-            stats_only=False,
-        )
-        logger.info("Successfully indexed: %d documents", success)
-        if errors:
-            logger.error("Failed documents: %d", len(errors))
-            for err in errors[:10]:
+    logger.info("Streaming data from %s", filepath)
+    # Parse the top-level array one document at a time so memory stays flat
+    # regardless of file size; use_float avoids Decimal values ES can't encode.
+    with open(filepath, "rb") as f:
+        try:
+            docs = ijson.items(f, "item", use_float=True)
+            success = 0
+            errors: List[Dict[str, Any]] = []
+            for ok, info in parallel_bulk(
+                es.options(request_timeout=BULK_REQUEST_TIMEOUT),
+                generate_bulk_actions(docs, index_name),
+                thread_count=thread_count,
+                queue_size=thread_count,
+                chunk_size=chunk_size,
+                max_chunk_bytes=max_chunk_mb * 1024 * 1024,
+                raise_on_error=False,
+            ):
+                if ok:
+                    success += 1
+                else:
+                    errors.append(info)
+            logger.info("Successfully indexed: %d documents", success)
+            if errors:
+                logger.error("Failed documents: %d", len(errors))
+                for err in errors[:10]:
+                    logger.error("  %s", err)
+        except BulkIndexError as e:
+            logger.error("Bulk indexing failed: %s", e)
+            for err in e.errors[:10]:
                 logger.error("  %s", err)
-    except BulkIndexError as e:
-        logger.error("Bulk indexing failed: %s", e)
-        for err in e.errors[:10]:
-            logger.error("  %s", err)
-        sys.exit(1)
+            sys.exit(1)
 
     es.indices.refresh(index=index_name)
     count = es.count(index=index_name)["count"]
@@ -181,5 +202,17 @@ if __name__ == "__main__":
         ),
         help="Path to clinical_trials.json",
     )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Documents per _bulk request (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--max-chunk-mb",
+        type=int,
+        default=DEFAULT_MAX_CHUNK_MB,
+        help=f"Max uncompressed MB per _bulk request (default: {DEFAULT_MAX_CHUNK_MB})",
+    )
     args = parser.parse_args()
-    ingest_data(args.filepath)
+    ingest_data(args.filepath, args.chunk_size, args.max_chunk_mb)
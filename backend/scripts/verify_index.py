@@ -7,16 +7,47 @@ Usage:
     cd backend && python -m scripts.verify_index
 """
 
-import logging
 import sys
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from elasticsearch import Elasticsearch
 from app.config import get_settings
 
-logger = logging.getLogger(__name__)
+VERIFY_PREFERENCE = "verify_index"
+
+Response = Dict[str, Any]
+Verification = Tuple[Dict[str, Any], Callable[[Response], None]]
+
+
+def _total(resp: Response) -> int:
+    return resp["hits"]["total"]["value"]
+
+
+def _nested_filter(path: str, query: Dict[str, Any]) -> Dict[str, Any]:
+    """Unscored, cacheable nested match for a query or filter aggregation."""
+    return {
+        "bool": {
+            "filter": [
+                {"nested": {"path": path, "query": query, "score_mode": "none"}}
+            ]
+        }
+    }
+
+
+# Filter aggregations in the one nested search, with the check each backs.
+_NESTED_CHECKS = (
+    ("sponsor_astrazeneca", "Nested query: sponsor AstraZeneca"),
+    ("facility_us", "Nested query: US facilities"),
+    ("condition_asthma", "Nested query: condition Asthma"),
+)
+
+
+def _constant_score(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Run ``query`` in filter context: no scoring, eligible for caching."""
+    return {"constant_score": {"filter": query}}
 
 
 class IndexVerifier:
@@ -26,142 +57,50 @@ class IndexVerifier:
         self.index = settings.es_index
         self.passed = 0
         self.failed = 0
+        # (name, passed, detail) per check, written out once by run_all.
+        self._results: List[Tuple[str, bool, str]] = []
 
     def check(self, name: str, condition: bool, detail: str = ""):
         if condition:
             self.passed += 1
-            logger.info("PASS: %s %s", name, detail)
         else:
             self.failed += 1
-            logger.error("FAIL: %s %s", name, detail)
+        self._results.append((name, condition, detail))
 
-    def verify_document_count(self):
-        count = self.es.count(index=self.index)["count"]
+    def verify_document_count(self, resp: Response):
+        count = _total(resp)
         self.check("Document count", count == 1000, f"(got {count})")
 
-    def verify_term_query(self):
-        resp = self.es.search(
-            index=self.index,
-            query={"term": {"phase": "PHASE2"}},
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
+    def verify_term_query(self, resp: Response):
+        hits = _total(resp)
         self.check("Term query: phase=PHASE2", hits > 0, f"(got {hits} hits)")
 
-    def verify_nct_id_exact(self):
-        resp = self.es.search(
-            index=self.index,
-            query={"term": {"nct_id": "NCT06890351"}},
-        )
-        hits = resp["hits"]["total"]["value"]
+    def verify_nct_id_exact(self, resp: Response):
+        hits = _total(resp)
         self.check("Term query: nct_id exact match", hits == 1, f"(got {hits})")
 
-    def verify_nested_sponsors(self):
-        resp = self.es.search(
-            index=self.index,
-            query={
-                "nested": {
-                    "path": "sponsors",
-                    "query": {"match": {"sponsors.name": "AstraZeneca"}},
-                }
-            },
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
-        self.check("Nested query: sponsor AstraZeneca", hits > 0, f"(got {hits})")
-
-    def verify_nested_facilities(self):
-        resp = self.es.search(
-            index=self.index,
-            query={
-                "nested": {
-                    "path": "facilities",
-                    "query": {"term": {"facilities.country": "United States"}},
-                }
-            },
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
-        self.check("Nested query: US facilities", hits > 0, f"(got {hits})")
-
-    def verify_nested_conditions(self):
-        resp = self.es.search(
-            index=self.index,
-            query={
-                "nested": {
-                    "path": "conditions",
-                    "query": {"match": {"conditions.name": "Asthma"}},
-                }
-            },
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
-        self.check("Nested query: condition Asthma", hits > 0, f"(got {hits})")
-
-    def verify_range_enrollment(self):
-        resp = self.es.search(
-            index=self.index,
-            query={"range": {"enrollment": {"gte": 100}}},
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
+    def verify_nested(self, resp: Response):
+        for agg, name in _NESTED_CHECKS:
+            count = resp["aggregations"][agg]["doc_count"]
+            self.check(name, count > 0, f"(got {count})")
+
+    def verify_range_enrollment(self, resp: Response):
+        hits = _total(resp)
         self.check("Range query: enrollment >= 100", hits > 0, f"(got {hits})")
 
-    def verify_range_date(self):
-        resp = self.es.search(
-            index=self.index,
-            query={"range": {"start_date": {"gte": "2025-01-01"}}},
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
+    def verify_range_date(self, resp: Response):
+        hits = _total(resp)
         self.check("Range query: start_date >= 2025", hits > 0, f"(got {hits})")
 
-    def verify_full_text_search(self):
-        resp = self.es.search(
-            index=self.index,
-            query={
-                "multi_match": {
-                    "query": "asthma",
-                    "fields": [
-                        "brief_title",
-                        "official_title",
-                        "brief_summaries_description",
-                    ],
-                }
-            },
-            size=0,
-        )
-        hits = resp["hits"]["total"]["value"]
+    def verify_full_text_search(self, resp: Response):
+        hits = _total(resp)
         self.check("Full-text search: asthma", hits > 0, f"(got {hits})")
 
-    def verify_autocomplete(self):
-        resp = self.es.search(
-            index=self.index,
-            query={
-                "multi_match": {
-                    "query": "Dose",
-                    "type": "bool_prefix",
-                    "fields": [
-                        "brief_title.suggest",
-                        "brief_title.suggest._2gram",
-                        "brief_title.suggest._3gram",
-                    ],
-                }
-            },
-            size=5,
-        )
-        hits = resp["hits"]["total"]["value"]
+    def verify_autocomplete(self, resp: Response):
+        hits = _total(resp)
         self.check("Autocomplete: 'Dose'", hits > 0, f"(got {hits})")
 
-    def verify_aggregations(self):
-        resp = self.es.search(
-            index=self.index,
-            size=0,
-            aggs={
-                "phases": {"terms": {"field": "phase", "size": 20}},
-                "statuses": {"terms": {"field": "overall_status", "size": 20}},
-            },
-        )
+    def verify_aggregations(self, resp: Response):
         phase_buckets = resp["aggregations"]["phases"]["buckets"]
         status_buckets = resp["aggregations"]["statuses"]["buckets"]
         self.check(
@@ -175,46 +114,154 @@ class IndexVerifier:
             f"(got {len(status_buckets)} buckets)",
         )
 
-    def verify_enrollment_nulls(self):
-        resp = self.es.search(
-            index=self.index,
-            query={"bool": {"must_not": {"exists": {"field": "enrollment"}}}},
-            size=0,
-        )
-        null_count = resp["hits"]["total"]["value"]
+    def verify_enrollment_nulls(self, resp: Response):
+        null_count = _total(resp)
         self.check(
             "Enrollment null handling",
             null_count > 100,
             f"(got {null_count} null enrollments)",
         )
 
-    def run_all(self) -> bool:
-        logger.info("=" * 60)
-        logger.info("Verifying index: %s", self.index)
-        logger.info("=" * 60)
-
-        self.verify_document_count()
-        self.verify_term_query()
-        self.verify_nct_id_exact()
-        self.verify_nested_sponsors()
-        self.verify_nested_facilities()
-        self.verify_nested_conditions()
-        self.verify_range_enrollment()
-        self.verify_range_date()
-        self.verify_full_text_search()
-        self.verify_autocomplete()
-        self.verify_aggregations()
-        self.verify_enrollment_nulls()
-
-        logger.info("=" * 60)
-        logger.info("Results: %d passed, %d failed", self.passed, self.failed)
-        logger.info("=" * 60)
+    def verifications(self) -> List[Verification]:
+        """Search bodies paired with the check that reads each response."""
+        return [
+            (
+                {"query": {"match_all": {}}, "size": 0},
+                self.verify_document_count,
+            ),
+            (
+                {"query": _constant_score({"term": {"phase": "PHASE2"}}), "size": 0},
+                self.verify_term_query,
+            ),
+            (
+                {
+                    "query": _constant_score({"term": {"nct_id": "NCT06890351"}}),
+                    "size": 0,
+                    # Counting to 2 is enough to tell "exactly one" apart.
+                    "track_total_hits": 2,
+                },
+                self.verify_nct_id_exact,
+            ),
+            (
+                {
+                    "size": 0,
+                    "aggs": {
+                        "sponsor_astrazeneca": {
+                            "filter": _nested_filter("sponsors", {"match": {"sponsors.name": "AstraZeneca"}}),
+                        },
+                        "facility_us": {
+                            "filter": _nested_filter("facilities", {"term": {"facilities.country": "United States"}}),
+                        },
+                        "condition_asthma": {
+                            "filter": _nested_filter("conditions", {"match": {"conditions.name": "Asthma"}}),
+                        },
+                    },
+                },
+                self.verify_nested,
+            ),
+            (
+                {"query": _constant_score({"range": {"enrollment": {"gte": 100}}}), "size": 0},
+                self.verify_range_enrollment,
+            ),
+            (
+                {
+                    "query": _constant_score({"range": {"start_date": {"gte": "2025-01-01"}}}),
+                    "size": 0,
+                },
+                self.verify_range_date,
+            ),
+            (
+                {
+                    "query": {
+                        "multi_match": {
+                            "query": "asthma",
+                            "fields": [
+                                "brief_title",
+                                "official_title",
+                                "brief_summaries_description",
+                            ],
+                        }
+                    },
+                    "size": 0,
+                },
+                self.verify_full_text_search,
+            ),
+            (
+                {
+                    "query": {
+                        "multi_match": {
+                            "query": "Dose",
+                            "type": "bool_prefix",
+                            "fields": [
+                                "brief_title.suggest",
+                                "brief_title.suggest._2gram",
+                                "brief_title.suggest._3gram",
+                            ],
+                        }
+                    },
+                    "size": 5,
+                },
+                self.verify_autocomplete,
+            ),
+            (
+                {
+                    "size": 0,
+                    "aggs": {
+                        "phases": {"terms": {"field": "phase", "size": 20}},
+                        "statuses": {"terms": {"field": "overall_status", "size": 20}},
+                    },
+                },
+                self.verify_aggregations,
+            ),
+            (
+                {
+                    "query": _constant_score(
+                        {"bool": {"must_not": {"exists": {"field": "enrollment"}}}}
+                    ),
+                    "size": 0,
+                },
+                self.verify_enrollment_nulls,
+            ),
+        ]
+
+    def run_searches(self) -> None:
+        """Run every verification search in one _msearch round trip.
+
+        Each search goes through the shard request cache with a stable
+        preference, so repeat runs are answered from the same shard copies'
+        caches.
+        """
+        verifications = self.verifications()
+        header = {"preference": VERIFY_PREFERENCE, "request_cache": True}
+        searches: List[Dict[str, Any]] = []
+        for body, _ in verifications:
+            searches.append(header)
+            searches.append({"track_total_hits": True, **body})
+
+        responses = self.es.msearch(index=self.index, searches=searches)["responses"]
+        for (_, verify), resp in zip(verifications, responses):
+            if "error" in resp:
+                self.check(verify.__name__, False, f"(error: {resp['error']})")
+            else:
+                verify(resp)
 
+    def report(self) -> str:
+        rule = "=" * 60
+        lines = [rule, f"Verifying index: {self.index}", rule]
+        lines.extend(
+            f"{'PASS' if passed else 'FAIL'}: {name} {detail}"
+            for name, passed, detail in self._results
+        )
+        lines += [rule, f"Results: {self.passed} passed, {self.failed} failed", rule]
+        return "\n".join(lines) + "\n"
+
+    def run_all(self) -> bool:
+        self.run_searches()
+        sys.stdout.write(self.report())
         return self.failed == 0
 
 
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     verifier = IndexVerifier()
     success = verifier.run_all()
     sys.exit(0 if success else 1)
@@ -1,14 +1,35 @@
-import json
+from functools import cache
 from pathlib import Path
 
+import orjson
 import pytest
 
+from app.models.schemas import TrialResult
+from app.services.anthropic_client import get_anthropic_client
+
+
+@pytest.fixture(autouse=True)
+def reset_anthropic_client():
+    # The shared client is cached; drop it so each test's patched
+    # AsyncAnthropic is the one constructed.
+    get_anthropic_client.cache_clear()
+    yield
+    get_anthropic_client.cache_clear()
+
+
+DATA_PATH = Path(__file__).parent.parent.parent / "clinical_trials.json"
+
+
+@cache
+def _load_clinical_trials():
+    # Parsed at most once per process (one per xdist worker), and only
+    # when a test asks for the data.
+    return orjson.loads(DATA_PATH.read_bytes())
+
 
 @pytest.fixture(scope="session")
 def clinical_trials_data():
-    data_path = Path(__file__).parent.parent.parent / "clinical_trials.json"
-    with open(data_path) as f:
-        return json.load(f)
+    return _load_clinical_trials()
 
 
 @pytest.fixture
@@ -16,6 +37,31 @@ def sample_trial(clinical_trials_data):
     return clinical_trials_data[0]
 
 
+@pytest.fixture(scope="module")
+def sample_trial_result(clinical_trials_data):
+    """TrialResult built once per module from the first real trial."""
+    trial = clinical_trials_data[0]
+    return TrialResult(
+        nct_id=trial["nct_id"],
+        brief_title=trial["brief_title"],
+        official_title=trial.get("official_title"),
+        phase=trial.get("phase"),
+        overall_status=trial.get("overall_status"),
+        enrollment=trial.get("enrollment_numeric"),
+        # Raw lists: pydantic-core validates the nested models in one pass.
+        sponsors=trial.get("sponsors", []),
+        facilities=trial.get("facilities", []),
+        conditions=trial.get("conditions", []),
+        brief_summaries_description=trial.get("brief_summaries_description"),
+        start_date=trial.get("start_date"),
+        completion_date=trial.get("completion_date"),
+        age=[a["age_category"] for a in trial.get("age", [])],
+        gender=trial.get("gender"),
+        study_type=trial.get("study_type"),
+        source=trial.get("source"),
+    )
+
+
 @pytest.fixture
 def sample_trial_minimal():
     return {
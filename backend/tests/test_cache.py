@@ -0,0 +1,172 @@
+"""Tests for the async TTL cache utility."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.utils.cache import AsyncTTLCache, normalize_query, query_signature
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestAsyncTTLCache:
+    async def test_miss_then_hit(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        factory = AsyncMock(return_value="value")
+
+        assert await cache.get_or_set("k", factory) == "value"
+        assert await cache.get_or_set("k", factory) == "value"
+        factory.assert_awaited_once()
+
+    async def test_expired_entry_is_refetched(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        factory = AsyncMock(side_effect=["old", "new"])
+
+        await cache.get_or_set("k", factory)
+        clock.now = 6
+        assert await cache.get_or_set("k", factory) == "new"
+
+    async def test_stale_entry_served_while_revalidating(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, stale_ttl=5, timer=clock)
+        factory = AsyncMock(side_effect=["old", "new"])
+
+        await cache.get_or_set("k", factory)
+        clock.now = 7
+        assert await cache.get_or_set("k", factory) == "old"
+        await asyncio.sleep(0)
+        assert await cache.get_or_set("k", factory) == "new"
+        assert factory.await_count == 2
+
+    async def test_failed_refresh_keeps_stale_value(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, stale_ttl=5, timer=clock)
+        await cache.get_or_set("k", AsyncMock(return_value="old"))
+        clock.now = 7
+
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        assert await cache.get_or_set("k", failing) == "old"
+        await asyncio.sleep(0)
+        assert len(cache) == 1
+
+    async def test_concurrent_misses_share_one_call(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        release = asyncio.Event()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        waiters = [asyncio.ensure_future(cache.get_or_set("k", factory)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == ["value"] * 3
+        assert calls == 1
+
+    async def test_concurrent_failure_reaches_every_waiter(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        factory = AsyncMock(side_effect=RuntimeError("boom"))
+
+        results = await asyncio.gather(
+            cache.get_or_set("k", factory),
+            cache.get_or_set("k", factory),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        factory.assert_awaited_once()
+        assert await cache.get_or_set("k", AsyncMock(return_value="ok")) == "ok"
+
+    async def test_cancelled_waiter_does_not_cancel_load(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        release = asyncio.Event()
+
+        async def factory():
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(cache.get_or_set("k", factory))
+        second = asyncio.ensure_future(cache.get_or_set("k", factory))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "value"
+
+    async def test_lru_eviction(self, clock):
+        cache = AsyncTTLCache(maxsize=2, ttl=5, timer=clock)
+        for key in ("a", "b"):
+            await cache.get_or_set(key, AsyncMock(return_value=key))
+        await cache.get_or_set("a", AsyncMock())
+        await cache.get_or_set("c", AsyncMock(return_value="c"))
+
+        factory = AsyncMock(return_value="b2")
+        assert await cache.get_or_set("b", factory) == "b2"
+        factory.assert_awaited_once()
+
+    async def test_cache_if_rejects_value(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        factory = AsyncMock(return_value=None)
+
+        await cache.get_or_set("k", factory, cache_if=lambda v: v is not None)
+        await cache.get_or_set("k", factory, cache_if=lambda v: v is not None)
+        assert factory.await_count == 2
+
+    async def test_clear(self, clock):
+        cache = AsyncTTLCache(maxsize=10, ttl=5, timer=clock)
+        await cache.get_or_set("k", AsyncMock(return_value=1))
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestNormalizeQuery:
+    def test_case_and_whitespace_insensitive(self):
+        assert normalize_query("  Breast   CANCER ") == "breast cancer"
+
+
+class TestQuerySignature:
+    def test_case_whitespace_and_punctuation_ignored(self):
+        assert query_signature("Phase 2  Breast Cancer, recruiting?") == (
+            "phase 2 breast cancer recruiting"
+        )
+
+    def test_leading_filler_words_stripped(self):
+        assert query_signature("Show me clinical trials for asthma in Boston") == (
+            query_signature("asthma in Boston")
+        )
+
+    def test_inner_filler_words_kept(self):
+        assert query_signature("asthma in Boston") != query_signature("asthma Boston")
+
+    def test_all_filler_query_not_empty(self):
+        assert query_signature("clinical trials") == "clinical trials"
+
+    def test_word_order_matters(self):
+        assert query_signature("Phase 2 Breast Cancer recruiting") != query_signature(
+            "recruiting breast cancer PHASE 2"
+        )
+
+    def test_reordered_negations_differ(self):
+        assert query_signature("phase 2 not phase 3") != query_signature("phase 3 not phase 2")
+        assert query_signature("adults not children") != query_signature("children not adults")
+        assert query_signature("over 100 under 500") != query_signature("over 500 under 100")
+
+    def test_repeated_words_kept(self):
+        assert query_signature("phase 2 not phase 3") == "phase 2 not phase 3"
+
+    def test_meaningful_words_kept(self):
+        assert query_signature("lung cancer not recruiting") != query_signature(
+            "lung cancer recruiting"
+        )
+        assert query_signature("covid-19 vaccine") == "covid-19 vaccine"
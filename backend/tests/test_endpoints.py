@@ -1,27 +1,69 @@
 """Tests for FastAPI search and suggestion endpoints."""
 
-from unittest.mock import AsyncMock, patch
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+from app.health_interceptor import HealthInterceptor
+from app.main import api, app
+from app.routers import search as search_router
 from app.models.entities import ExtractedEntities
 from app.models.schemas import TrialResult
+from app.services.es_service import encode_cursor
 
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def clear_caches():
+    search_router._entity_cache.clear()
+    search_router._search_cache.clear()
+
+
+@pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    # Started once: lifespan marks the app ready.
+    # Mocks are applied per test, so no state leaks between tests.
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def openapi_schema(client):
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def mock_es(monkeypatch):
+    mock = MagicMock()
+    monkeypatch.setattr(search_router, "es_service", mock)
+    return mock
+
+
+@pytest.fixture
+def mock_extract(monkeypatch):
+    mock = AsyncMock()
+    monkeypatch.setattr(search_router, "extract_entities", mock)
+    return mock
 
 
-SAMPLE_RESULT = TrialResult(
+@pytest.fixture
+def mock_summary(monkeypatch):
+    mock = AsyncMock()
+    monkeypatch.setattr(search_router, "generate_summary", mock)
+    return mock
+
+
+# Trusted literal: built without validation, as es_service returns hits.
+SAMPLE_RESULT = TrialResult.model_construct(
     nct_id="NCT00000001",
     brief_title="Test Trial for Lung Cancer",
     phase="PHASE3",
     overall_status="RECRUITING",
     enrollment=200,
-)
+).model_dump()
 
 
 # ---------- Health endpoint ----------
@@ -39,6 +81,68 @@ class TestHealthEndpoint:
         data = response.json()
         assert "es_url" in data
 
+    def test_live_returns_200(self, client):
+        response = client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
+
+    def test_health_short_circuits_inner_app(self):
+        async def inner(scope, receive, send):
+            raise AssertionError("inner app should not be called")
+
+        interceptor = HealthInterceptor(inner, {"status": "healthy"})
+        response = TestClient(interceptor).get("/health")
+        assert response.status_code == 200
+        assert response.json() == {"status": "healthy"}
+
+    def test_non_health_paths_delegated(self):
+        seen = []
+
+        async def inner(scope, receive, send):
+            seen.append(scope["path"])
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        interceptor = HealthInterceptor(inner, {"status": "healthy"})
+        response = TestClient(interceptor).get("/ready")
+        assert response.status_code == 204
+        assert seen == ["/ready"]
+
+
+# ---------- Ready endpoint ----------
+
+
+class TestReadyEndpoint:
+    def test_ready_returns_503_before_startup(self, monkeypatch):
+        monkeypatch.setattr(api.state, "ready", False, raising=False)
+        response = TestClient(app).get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "not ready"
+
+    @patch("app.main.es_service")
+    def test_ready_uses_shared_client(self, mock_es, client):
+        mock_es.es.ping = AsyncMock(return_value=True)
+
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        mock_es.es.ping.assert_awaited_once()
+
+    @patch("app.main.es_service")
+    def test_ready_returns_503_when_ping_fails(self, mock_es, client):
+        mock_es.es.ping = AsyncMock(return_value=False)
+
+        response = client.get("/ready")
+        assert response.status_code == 503
+
+    @patch("app.main.es_service")
+    def test_ready_returns_503_on_error(self, mock_es, client):
+        mock_es.es.ping = AsyncMock(side_effect=ConnectionError("ES down"))
+
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["detail"] == "ES down"
+
 
 # ---------- CORS ----------
 
@@ -69,12 +173,10 @@ class TestCORS:
 
 
 class TestSearchEndpoint:
-    @patch("app.routers.search.es_service")
-    @patch("app.routers.search.extract_entities", new_callable=AsyncMock)
     def test_search_returns_results(self, mock_extract, mock_es, client):
         entities = ExtractedEntities(condition="lung cancer", confidence=0.9)
         mock_extract.return_value = entities
-        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1))
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
 
         response = client.get("/api/search/lung cancer")
         assert response.status_code == 200
@@ -86,19 +188,101 @@ class TestSearchEndpoint:
         assert data["results"][0]["nct_id"] == "NCT00000001"
         assert data["query_interpretation"]["condition"] == "lung cancer"
 
-    @patch("app.routers.search.es_service")
-    @patch("app.routers.search.extract_entities", new_callable=AsyncMock)
     def test_search_pagination_params(self, mock_extract, mock_es, client):
         entities = ExtractedEntities()
         mock_extract.return_value = entities
-        mock_es.search = AsyncMock(return_value=([], 0))
+        mock_es.search = AsyncMock(return_value=([], 0, None))
 
         response = client.get("/api/search/test?page=2&page_size=5")
         assert response.status_code == 200
         data = response.json()
         assert data["page"] == 2
         assert data["page_size"] == 5
-        mock_es.search.assert_called_once_with(entities, 2, 5)
+        mock_es.search.assert_called_once_with(entities, 2, 5, None)
+
+    def test_search_passes_decoded_cursor(self, mock_extract, mock_es, client):
+        entities = ExtractedEntities()
+        mock_extract.return_value = entities
+        mock_es.search = AsyncMock(return_value=([], 0, "next"))
+
+        cursor = encode_cursor([1.5, 200, "NCT00000001"])
+        response = client.get(f"/api/search/test?page=3&after={cursor}")
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] == "next"
+        mock_es.search.assert_called_once_with(
+            entities, 3, 10, [1.5, 200, "NCT00000001"]
+        )
+
+    def test_search_paraphrase_reuses_entities(self, mock_extract, mock_es, client):
+        mock_extract.return_value = ExtractedEntities(condition="asthma", phase="PHASE2")
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+
+        client.get("/api/search/show me phase 2 asthma trials")
+        client.get("/api/search/Phase 2  Asthma trials.")
+        mock_extract.assert_awaited_once()
+
+    def test_search_repeat_query_served_from_cache(self, mock_extract, mock_es, client):
+        mock_extract.return_value = ExtractedEntities(condition="asthma", confidence=0.9)
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+
+        first = client.get("/api/search/Asthma trials")
+        second = client.get("/api/search/asthma   TRIALS")
+        assert first.json() == second.json()
+        mock_extract.assert_awaited_once()
+        mock_es.search.assert_awaited_once()
+
+    def test_search_error_fallback_not_cached(self, mock_extract, mock_es, client):
+        mock_extract.return_value = ExtractedEntities(
+            confidence=0.0, clarification="Service unavailable"
+        )
+        mock_es.search = AsyncMock(return_value=([], 0, None))
+
+        client.get("/api/search/asthma")
+        client.get("/api/search/asthma")
+        assert mock_extract.await_count == 2
+
+    def test_search_low_confidence_not_cached(self, mock_extract, mock_es, client):
+        mock_extract.return_value = ExtractedEntities(
+            confidence=0.3, clarification="Did you mean breast or lung cancer?"
+        )
+        mock_es.search = AsyncMock(return_value=([], 0, None))
+
+        client.get("/api/search/cancer")
+        client.get("/api/search/cancer")
+        assert mock_extract.await_count == 2
+
+    def test_search_include_summary(self, mock_extract, mock_es, mock_summary, client):
+        mock_extract.return_value = ExtractedEntities(condition="lung cancer", confidence=0.9)
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+        mock_summary.return_value = "One trial [1]."
+
+        response = client.get("/api/search/lung cancer?include_summary=true")
+        assert response.status_code == 200
+        assert response.json()["summary"] == "One trial [1]."
+        mock_summary.assert_awaited_once_with([SAMPLE_RESULT], "lung cancer")
+
+    def test_search_summary_off_by_default(self, mock_extract, mock_es, mock_summary, client):
+        mock_extract.return_value = ExtractedEntities(condition="lung cancer", confidence=0.9)
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+
+        response = client.get("/api/search/lung cancer")
+        assert response.json()["summary"] is None
+        mock_summary.assert_not_awaited()
+
+    def test_summary_reuses_cached_search(self, mock_extract, mock_es, mock_summary, client):
+        mock_extract.return_value = ExtractedEntities(condition="lung cancer", confidence=0.9)
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+        mock_summary.return_value = "One trial [1]."
+
+        client.get("/api/search/lung cancer")
+        response = client.get("/api/summary/lung cancer")
+        assert response.json()["summary"] == "One trial [1]."
+        mock_extract.assert_awaited_once()
+        mock_es.search.assert_awaited_once()
+
+    def test_search_invalid_cursor_returns_400(self, client):
+        response = client.get("/api/search/test?after=garbage")
+        assert response.status_code == 400
 
     def test_search_invalid_page_returns_422(self, client):
         response = client.get("/api/search/test?page=0")
@@ -108,22 +292,19 @@ class TestSearchEndpoint:
         response = client.get("/api/search/test?page_size=101")
         assert response.status_code == 422
 
-    @patch("app.routers.search.es_service")
-    @patch("app.routers.search.extract_entities", new_callable=AsyncMock)
     def test_search_includes_clarification(self, mock_extract, mock_es, client):
         entities = ExtractedEntities(
             confidence=0.5,
             clarification="Did you mean breast cancer or lung cancer?",
         )
         mock_extract.return_value = entities
-        mock_es.search = AsyncMock(return_value=([], 0))
+        mock_es.search = AsyncMock(return_value=([], 0, None))
 
         response = client.get("/api/search/cancer")
         assert response.status_code == 200
         data = response.json()
         assert data["clarification"] == "Did you mean breast cancer or lung cancer?"
 
-    @patch("app.routers.search.extract_entities", new_callable=AsyncMock)
     def test_search_service_error_returns_500(self, mock_extract, client):
         mock_extract.side_effect = RuntimeError("LLM unavailable")
 
@@ -131,6 +312,66 @@ class TestSearchEndpoint:
         assert response.status_code == 500
 
 
+# ---------- Stream endpoint ----------
+
+
+class TestStreamEndpoint:
+    def test_stream_returns_ndjson_lines(self, mock_extract, mock_es, client):
+        mock_extract.return_value = ExtractedEntities(condition="asthma", confidence=0.9)
+        second = {**SAMPLE_RESULT, "nct_id": "NCT00000002"}
+
+        async def fake_iter(*args):
+            for result in (SAMPLE_RESULT, second):
+                yield result
+
+        mock_es.search_iter = fake_iter
+
+        response = client.get("/api/search/asthma/stream")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["nct_id"] for line in lines] == ["NCT00000001", "NCT00000002"]
+
+    def test_stream_invalid_cursor_returns_400(self, client):
+        response = client.get("/api/search/asthma/stream?after=garbage")
+        assert response.status_code == 400
+
+
+# ---------- Filter endpoint ----------
+
+
+class TestFilterEndpoint:
+    def test_filter_valid_phase_and_status(self, mock_es, client):
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+
+        response = client.get("/api/filter?phase=PHASE1/PHASE2&status=RECRUITING")
+        assert response.status_code == 200
+        interp = response.json()["query_interpretation"]
+        assert interp["phase"] == "PHASE1/PHASE2"
+        assert interp["status"] == "RECRUITING"
+
+    def test_filter_invalid_phase_returns_400(self, mock_es, client):
+        mock_es.search = AsyncMock()
+        response = client.get("/api/filter?phase=PHASE9")
+        assert response.status_code == 400
+        mock_es.search.assert_not_called()
+
+    def test_filter_accepts_any_letter_case(self, mock_es, client):
+        mock_es.search = AsyncMock(return_value=([SAMPLE_RESULT], 1, None))
+
+        response = client.get("/api/filter?phase=Phase2&status=recruiting")
+        assert response.status_code == 200
+        interp = response.json()["query_interpretation"]
+        assert interp["phase"] == "PHASE2"
+        assert interp["status"] == "RECRUITING"
+
+    def test_filter_invalid_status_returns_400(self, mock_es, client):
+        mock_es.search = AsyncMock()
+        response = client.get("/api/filter?status=OPEN")
+        assert response.status_code == 400
+        mock_es.search.assert_not_called()
+
+
 # ---------- Suggest endpoint ----------
 
 
@@ -175,16 +416,20 @@ class TestOpenAPIDocs:
         response = client.get("/redoc")
         assert response.status_code == 200
 
-    def test_openapi_schema_has_metadata(self, client):
-        response = client.get("/openapi.json")
-        assert response.status_code == 200
-        schema = response.json()
-        assert schema["info"]["title"] == "Clinical Trials Search API"
-        assert schema["info"]["version"] == "1.0.0"
-        assert schema["info"]["description"] == "Natural language search for clinical trials"
-
-    def test_openapi_schema_has_search_tag(self, client):
-        response = client.get("/openapi.json")
-        schema = response.json()
-        tag_names = [t["name"] for t in schema.get("tags", [])]
+    def test_openapi_schema_has_metadata(self, openapi_schema):
+        info = openapi_schema["info"]
+        assert info["title"] == "Clinical Trials Search API"
+        assert info["version"] == "1.0.0"
+        assert info["description"] == "Natural language search for clinical trials"
+
+    def test_openapi_schema_has_search_tag(self, openapi_schema):
+        tag_names = [t["name"] for t in openapi_schema.get("tags", [])]
         assert "search" in tag_names
+
+    def test_openapi_schema_documents_search_response(self, openapi_schema):
+        assert "SearchResponse" in openapi_schema["components"]["schemas"]
+
+    def test_openapi_schema_documents_summary_and_suggestions(self, openapi_schema):
+        schemas = openapi_schema["components"]["schemas"]
+        assert "SummaryResponse" in schemas
+        assert "SuggestionResponse" in schemas
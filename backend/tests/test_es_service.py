@@ -1,68 +1,166 @@
 """Tests for the Elasticsearch query builder and search service."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import copy
+import gc
+import weakref
+from types import MappingProxyType
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.models.entities import ExtractedEntities, LocationFilter
-from app.models.schemas import AgeCategory, Facility, Sponsor, TrialResult
-from app.services.es_service import ElasticsearchService
+from app.models.schemas import Facility, Sponsor, TrialResult
+from app.services.es_service import ElasticsearchService, decode_cursor, encode_cursor
 
 
-@pytest.fixture
-def service():
-    with patch("app.services.es_service.Elasticsearch"):
+@pytest.fixture(scope="session")
+def shared_service():
+    with patch("app.services.es_service.AsyncElasticsearch"):
         with patch("app.services.es_service.get_settings") as mock_settings:
             mock_settings.return_value = MagicMock(
                 es_url="http://localhost:9200",
                 es_index="clinical_trials",
+                es_msearch_window_ms=5.0,
             )
             svc = ElasticsearchService()
     return svc
 
 
-# ---------- build_query tests ----------
+@pytest.fixture
+def service(shared_service, monkeypatch):
+    # Built once per session; the attributes tests reassign are restored
+    # after each test so call state doesn't leak between them.
+    monkeypatch.setattr(shared_service, "es", MagicMock())
+    monkeypatch.setattr(shared_service, "batch_window", shared_service.batch_window)
+    return shared_service
 
 
-class TestBuildQueryEmpty:
-    def test_empty_entities_returns_match_all(self, service):
-        entities = ExtractedEntities()
-        query = service.build_query(entities)
-        assert query == {"match_all": {}}
-
-    def test_all_none_returns_match_all(self, service):
-        entities = ExtractedEntities(
-            phase=None, condition=None, status=None, location=None,
-            sponsor=None, keyword=None, age_group=None,
-            enrollment_min=None, enrollment_max=None,
-        )
-        query = service.build_query(entities)
-        assert query == {"match_all": {}}
-
+def test_client_uses_compression_and_pool_sizing():
+    with patch("app.services.es_service.AsyncElasticsearch") as mock_cls:
+        with patch("app.services.es_service.get_settings") as mock_settings:
+            mock_settings.return_value = MagicMock(
+                es_url="http://localhost:9200",
+                es_index="clinical_trials",
+                es_msearch_window_ms=5.0,
+            )
+            ElasticsearchService()
 
-class TestBuildQueryPhase:
-    def test_phase_only(self, service):
-        entities = ExtractedEntities(phase="PHASE2")
-        query = service.build_query(entities)
-        assert query == {
-            "bool": {
-                "filter": [{"term": {"phase": "PHASE2"}}],
-            }
-        }
+    kwargs = mock_cls.call_args[1]
+    assert kwargs["http_compress"] is True
+    assert kwargs["connections_per_node"] >= 4
+    assert kwargs["retry_on_timeout"] is True
 
 
-class TestBuildQueryStatus:
-    def test_status_only(self, service):
-        entities = ExtractedEntities(status="RECRUITING")
-        query = service.build_query(entities)
-        assert query == {
-            "bool": {
-                "filter": [{"term": {"overall_status": "RECRUITING"}}],
-            }
-        }
+# ---------- build_query tests ----------
 
 
-class TestBuildQueryCondition:
+def _first_filter(query):
+    return query["bool"]["filter"][0]
+
+
+def _nested(query):
+    nested = _first_filter(query)["nested"]
+    return nested["path"], nested["query"]
+
+
+_ALL_NONE = ExtractedEntities(
+    phase=None, condition=None, status=None, location=None,
+    sponsor=None, keyword=None, age_group=None,
+    enrollment_min=None, enrollment_max=None,
+)
+
+# (entities, part of the query under test, expected value of that part)
+BUILD_QUERY_CASES = [
+    pytest.param(ExtractedEntities(), lambda q: q, {"match_all": {}}, id="empty"),
+    pytest.param(_ALL_NONE, lambda q: q, {"match_all": {}}, id="all-none"),
+    pytest.param(
+        ExtractedEntities(location=LocationFilter()),
+        lambda q: q,
+        {"match_all": {}},
+        id="location-empty",
+    ),
+    pytest.param(
+        ExtractedEntities(phase="PHASE2"),
+        lambda q: q,
+        {"bool": {"filter": [{"term": {"phase": "PHASE2"}}]}},
+        id="phase",
+    ),
+    pytest.param(
+        ExtractedEntities(status="RECRUITING"),
+        lambda q: q,
+        {"bool": {"filter": [{"term": {"overall_status": "RECRUITING"}}]}},
+        id="status",
+    ),
+    pytest.param(
+        ExtractedEntities(location=LocationFilter(country="United States")),
+        lambda q: (_nested(q)[0], _nested(q)[1]["bool"]["must"]),
+        ("facilities", [{"term": {"facilities.country": "United States"}}]),
+        id="location-country",
+    ),
+    pytest.param(
+        ExtractedEntities(
+            location=LocationFilter(
+                city="Boston", state="Massachusetts", country="United States"
+            )
+        ),
+        lambda q: len(_nested(q)[1]["bool"]["must"]),
+        3,
+        id="location-full",
+    ),
+    pytest.param(
+        ExtractedEntities(sponsor="Pfizer"),
+        _nested,
+        ("sponsors", {"match": {"sponsors.name": "Pfizer"}}),
+        id="sponsor",
+    ),
+    pytest.param(
+        ExtractedEntities(age_group="adult"),
+        _nested,
+        ("age", {"term": {"age.age_category": "adult"}}),
+        id="age-group",
+    ),
+    pytest.param(
+        ExtractedEntities(enrollment_min=100),
+        lambda q: _first_filter(q)["range"]["enrollment"],
+        {"gte": 100},
+        id="enrollment-min",
+    ),
+    pytest.param(
+        ExtractedEntities(enrollment_max=500),
+        lambda q: _first_filter(q)["range"]["enrollment"],
+        {"lte": 500},
+        id="enrollment-max",
+    ),
+    pytest.param(
+        ExtractedEntities(enrollment_min=50, enrollment_max=200),
+        lambda q: _first_filter(q)["range"]["enrollment"],
+        {"gte": 50, "lte": 200},
+        id="enrollment-both",
+    ),
+    pytest.param(
+        ExtractedEntities(phase="PHASE3", condition="Diabetes"),
+        lambda q: (len(q["bool"]["must"]), len(q["bool"]["filter"])),
+        (1, 1),
+        id="phase-and-condition",
+    ),
+    pytest.param(
+        ExtractedEntities(
+            phase="PHASE2", status="RECRUITING", sponsor="Pfizer", age_group="adult"
+        ),
+        lambda q: len(q["bool"]["filter"]),
+        4,
+        id="multiple-filters",
+    ),
+]
+
+
+@pytest.mark.parametrize("entities,part,expected", BUILD_QUERY_CASES)
+def test_build_query(service, entities, part, expected):
+    assert part(service.build_query(entities)) == expected
+
+
+class TestBuildQueryMultiMatch:
     def test_condition_produces_multi_match(self, service):
         entities = ExtractedEntities(condition="Asthma")
         query = service.build_query(entities)
@@ -77,8 +175,6 @@ class TestBuildQueryCondition:
         assert "official_title^2" in mm["fields"]
         assert "brief_summaries_description" in mm["fields"]
 
-
-class TestBuildQueryKeyword:
     def test_keyword_produces_phrase_prefix(self, service):
         entities = ExtractedEntities(keyword="BRCA1")
         query = service.build_query(entities)
@@ -90,110 +186,73 @@ class TestBuildQueryKeyword:
         assert "detailed_description" in mm["fields"]
 
 
-class TestBuildQueryLocation:
-    def test_location_country_only(self, service):
-        entities = ExtractedEntities(
-            location=LocationFilter(country="United States")
-        )
-        query = service.build_query(entities)
-        nested = query["bool"]["filter"][0]["nested"]
-        assert nested["path"] == "facilities"
-        must = nested["query"]["bool"]["must"]
-        assert len(must) == 1
-        assert must[0] == {"term": {"facilities.country": "United States"}}
+class TestBuildQueryCache:
+    def test_only_confidence_and_clarification_short_circuits(self, service):
+        entities = ExtractedEntities(confidence=0.4, clarification="Which cancer?")
+        assert service.build_query(entities) == {"match_all": {}}
 
-    def test_location_full(self, service):
-        entities = ExtractedEntities(
-            location=LocationFilter(
-                city="Boston", state="Massachusetts", country="United States"
-            )
+    def test_equal_entities_build_equal_query(self, service):
+        first = service.build_query(
+            ExtractedEntities(phase="PHASE2", location=LocationFilter(country="Canada"))
         )
-        query = service.build_query(entities)
-        nested = query["bool"]["filter"][0]["nested"]
-        must = nested["query"]["bool"]["must"]
-        assert len(must) == 3
-
-    def test_location_empty_produces_match_all(self, service):
-        entities = ExtractedEntities(
-            location=LocationFilter()
+        second = service.build_query(
+            ExtractedEntities(phase="PHASE2", location=LocationFilter(country="Canada"))
         )
-        query = service.build_query(entities)
-        assert query == {"match_all": {}}
-
-
-class TestBuildQuerySponsor:
-    def test_sponsor_nested(self, service):
-        entities = ExtractedEntities(sponsor="Pfizer")
-        query = service.build_query(entities)
-        nested = query["bool"]["filter"][0]["nested"]
-        assert nested["path"] == "sponsors"
-        assert nested["query"] == {"match": {"sponsors.name": "Pfizer"}}
-
+        assert first == second
 
-class TestBuildQueryAgeGroup:
-    def test_age_group_nested(self, service):
-        entities = ExtractedEntities(age_group="adult")
+    def test_mutating_returned_query_does_not_leak(self, service):
+        entities = ExtractedEntities(phase="PHASE2")
         query = service.build_query(entities)
-        nested = query["bool"]["filter"][0]["nested"]
-        assert nested["path"] == "age"
-        assert nested["query"] == {"term": {"age.age_category": "adult"}}
-
+        query["bool"]["filter"].append({"term": {"overall_status": "RECRUITING"}})
+        assert service.build_query(entities) == {
+            "bool": {"filter": [{"term": {"phase": "PHASE2"}}]}
+        }
 
-class TestBuildQueryEnrollment:
-    def test_enrollment_min_only(self, service):
-        entities = ExtractedEntities(enrollment_min=100)
-        query = service.build_query(entities)
-        range_q = query["bool"]["filter"][0]["range"]["enrollment"]
-        assert range_q == {"gte": 100}
+    def test_mutating_match_all_does_not_leak(self, service):
+        service.build_query(ExtractedEntities())["match_all"]["boost"] = 2.0
+        assert service.build_query(ExtractedEntities()) == {"match_all": {}}
 
-    def test_enrollment_max_only(self, service):
-        entities = ExtractedEntities(enrollment_max=500)
-        query = service.build_query(entities)
-        range_q = query["bool"]["filter"][0]["range"]["enrollment"]
-        assert range_q == {"lte": 500}
+    def test_cache_does_not_keep_service_alive(self):
+        with patch("app.services.es_service.AsyncElasticsearch"):
+            svc = ElasticsearchService()
+        svc.build_query(ExtractedEntities(phase="PHASE4"))
+        ref = weakref.ref(svc)
+        del svc
+        gc.collect()
+        assert ref() is None
+
+    def test_different_entities_build_new_query(self, service):
+        assert service.build_query(ExtractedEntities(phase="PHASE2")) != (
+            service.build_query(ExtractedEntities(phase="PHASE3"))
+        )
 
-    def test_enrollment_both(self, service):
-        entities = ExtractedEntities(enrollment_min=50, enrollment_max=200)
-        query = service.build_query(entities)
-        range_q = query["bool"]["filter"][0]["range"]["enrollment"]
-        assert range_q == {"gte": 50, "lte": 200}
 
+# ---------- search tests ----------
 
-class TestBuildQueryCombined:
-    def test_phase_and_condition(self, service):
-        entities = ExtractedEntities(phase="PHASE3", condition="Diabetes")
-        query = service.build_query(entities)
-        assert "must" in query["bool"]
-        assert "filter" in query["bool"]
-        assert len(query["bool"]["must"]) == 1
-        assert len(query["bool"]["filter"]) == 1
-
-    def test_multiple_filters(self, service):
-        entities = ExtractedEntities(
-            phase="PHASE2",
-            status="RECRUITING",
-            sponsor="Pfizer",
-            age_group="adult",
-        )
-        query = service.build_query(entities)
-        assert len(query["bool"]["filter"]) == 4
 
+def _stub(response):
+    # Plain coroutine stand-in for es.search when a test doesn't inspect calls.
+    async def search(**_):
+        return response
 
-# ---------- search tests ----------
+    return search
 
 
 def _mock_es_response(hits, total=None):
     if total is None:
         total = len(hits)
+    # Each response gets its own deep copy of the hits, so nested lists and
+    # dicts changed by one test never leak into another.
     return {
         "hits": {
             "total": {"value": total},
-            "hits": [{"_source": h} for h in hits],
+            "hits": [{"_source": copy.deepcopy(dict(h))} for h in hits],
         }
     }
 
 
-SAMPLE_HIT = {
+# Top-level read-only; _mock_es_response deep-copies it for each response.
+SAMPLE_HIT = MappingProxyType({
     "nct_id": "NCT00000001",
     "brief_title": "Test Trial",
     "official_title": "Official Test Trial",
@@ -215,109 +274,211 @@ SAMPLE_HIT = {
     "gender": "All",
     "study_type": "Interventional",
     "source": "ClinicalTrials.gov",
-}
+})
 
 
-class TestSearch:
-    @pytest.mark.asyncio
-    async def test_search_maps_results(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([SAMPLE_HIT]))
-        entities = ExtractedEntities(condition="Asthma")
+@pytest.fixture(scope="session")
+async def sample_search(shared_service):
+    original = shared_service.es
+    shared_service.es = MagicMock(search=_stub(_mock_es_response([SAMPLE_HIT])))
+    try:
+        return await shared_service.search(ExtractedEntities(condition="Asthma"))
+    finally:
+        shared_service.es = original
 
-        results, total = await service.search(entities)
+
+class TestSearch:
+    def test_search_maps_results(self, sample_search):
+        results, total, _ = sample_search
 
         assert total == 1
         assert len(results) == 1
         r = results[0]
-        assert isinstance(r, TrialResult)
-        assert r.nct_id == "NCT00000001"
-        assert r.phase == "PHASE2"
-        assert r.enrollment == 150
+        assert TrialResult.model_validate(r).nct_id == "NCT00000001"
+        assert r["nct_id"] == "NCT00000001"
+        assert r["phase"] == "PHASE2"
+        assert r["enrollment"] == 150
+
+    def test_search_sponsors_mapped(self, sample_search):
+        r = sample_search[0][0]
+        assert len(r["sponsors"]) == 1
+        assert Sponsor.model_validate(r["sponsors"][0]).name == "Pfizer"
+        assert r["sponsors"][0]["name"] == "Pfizer"
+        assert r["sponsors"][0]["agency_class"] == "INDUSTRY"
+
+    def test_search_facilities_limited_to_3(self, sample_search):
+        r = sample_search[0][0]
+        assert len(r["facilities"]) == 3
+        assert Facility.model_validate(r["facilities"][0]).city == "Boston"
+        assert r["facilities"][0]["zip"] == "02115"
+        assert r["facilities"][0]["status"] == "RECRUITING"
+
+    def test_search_age_flattened_to_strings(self, sample_search):
+        r = sample_search[0][0]
+        assert r["age"] == ["adult", "older-adults"]
+
+    def test_search_conditions_as_dicts(self, sample_search):
+        r = sample_search[0][0]
+        assert r["conditions"] == [{"name": "Asthma"}]
+
+    def test_search_extra_fields(self, sample_search):
+        r = sample_search[0][0]
+        assert r["gender"] == "All"
+        assert r["study_type"] == "Interventional"
+        assert r["source"] == "ClinicalTrials.gov"
+        assert r["completion_date"] == "2025-12-31"
 
-    @pytest.mark.asyncio
-    async def test_search_sponsors_mapped(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([SAMPLE_HIT]))
-        results, _ = await service.search(ExtractedEntities())
+    async def test_search_empty_response(self, service):
+        service.es.search = _stub(_mock_es_response([]))
+        results, total, _ = await service.search(ExtractedEntities())
 
-        r = results[0]
-        assert len(r.sponsors) == 1
-        assert isinstance(r.sponsors[0], Sponsor)
-        assert r.sponsors[0].name == "Pfizer"
-        assert r.sponsors[0].agency_class == "INDUSTRY"
+        assert results == []
+        assert total == 0
 
-    @pytest.mark.asyncio
-    async def test_search_facilities_limited_to_3(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([SAMPLE_HIT]))
-        results, _ = await service.search(ExtractedEntities())
+    async def test_search_pagination(self, service):
+        service.es.search = AsyncMock(return_value=_mock_es_response([], total=100))
+        await service.search(ExtractedEntities(), page=3, page_size=20)
 
-        r = results[0]
-        assert len(r.facilities) == 3
-        assert isinstance(r.facilities[0], Facility)
-        assert r.facilities[0].zip == "02115"
-        assert r.facilities[0].status == "RECRUITING"
+        call_body = service.es.search.call_args[1]["body"]
+        assert call_body["from"] == 40
+        assert call_body["size"] == 20
 
-    @pytest.mark.asyncio
-    async def test_search_age_mapped_to_age_category(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([SAMPLE_HIT]))
-        results, _ = await service.search(ExtractedEntities())
+    async def test_search_sort_has_nct_id_tiebreaker(self, service):
+        service.es.search = AsyncMock(return_value=_mock_es_response([]))
+        await service.search(ExtractedEntities())
 
-        r = results[0]
-        assert len(r.age) == 2
-        assert isinstance(r.age[0], AgeCategory)
-        assert r.age[0].age_category == "adult"
-        assert r.age[1].age_category == "older-adults"
+        call_body = service.es.search.call_args[1]["body"]
+        assert call_body["sort"][-1] == {"nct_id": "asc"}
 
-    @pytest.mark.asyncio
-    async def test_search_conditions_as_dicts(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([SAMPLE_HIT]))
-        results, _ = await service.search(ExtractedEntities())
+    async def test_search_returns_cursor_for_full_page(self, service):
+        response = _mock_es_response([SAMPLE_HIT], total=5)
+        response["hits"]["hits"][0]["sort"] = [1.5, 150, "NCT00000001"]
+        service.es.search = _stub(response)
 
-        r = results[0]
-        assert r.conditions == [{"name": "Asthma"}]
+        _, _, cursor = await service.search(ExtractedEntities(), page_size=1)
 
-    @pytest.mark.asyncio
-    async def test_search_extra_fields(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([SAMPLE_HIT]))
-        results, _ = await service.search(ExtractedEntities())
+        assert decode_cursor(cursor) == [1.5, 150, "NCT00000001"]
 
-        r = results[0]
-        assert r.gender == "All"
-        assert r.study_type == "Interventional"
-        assert r.source == "ClinicalTrials.gov"
-        assert r.completion_date == "2025-12-31"
+    async def test_search_no_cursor_for_short_page(self, service):
+        response = _mock_es_response([SAMPLE_HIT])
+        response["hits"]["hits"][0]["sort"] = [1.5, 150, "NCT00000001"]
+        service.es.search = _stub(response)
 
-    @pytest.mark.asyncio
-    async def test_search_empty_response(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([]))
-        results, total = await service.search(ExtractedEntities())
+        _, _, cursor = await service.search(ExtractedEntities(), page_size=10)
 
-        assert results == []
-        assert total == 0
+        assert cursor is None
 
-    @pytest.mark.asyncio
-    async def test_search_pagination(self, service):
-        service.es.search = MagicMock(return_value=_mock_es_response([], total=100))
-        await service.search(ExtractedEntities(), page=3, page_size=20)
+    async def test_search_after_replaces_from(self, service):
+        service.es.search = AsyncMock(return_value=_mock_es_response([]))
+        await service.search(
+            ExtractedEntities(), page=50, page_size=10,
+            search_after=[1.5, 150, "NCT00000001"],
+        )
 
         call_body = service.es.search.call_args[1]["body"]
-        assert call_body["from"] == 40
-        assert call_body["size"] == 20
+        assert call_body["search_after"] == [1.5, 150, "NCT00000001"]
+        assert "from" not in call_body
 
-    @pytest.mark.asyncio
     async def test_search_partial_data(self, service):
         minimal_hit = {
             "nct_id": "NCT00000002",
             "brief_title": "Minimal Trial",
         }
-        service.es.search = MagicMock(return_value=_mock_es_response([minimal_hit]))
-        results, total = await service.search(ExtractedEntities())
+        service.es.search = _stub(_mock_es_response([minimal_hit]))
+        results, total, _ = await service.search(ExtractedEntities())
 
         assert total == 1
         r = results[0]
-        assert r.nct_id == "NCT00000002"
-        assert r.sponsors == []
-        assert r.facilities == []
-        assert r.conditions == []
-        assert r.age == []
-        assert r.gender is None
-        assert r.study_type is None
+        assert r["nct_id"] == "NCT00000002"
+        assert r["sponsors"] == []
+        assert r["facilities"] == []
+        assert r["conditions"] == []
+        assert r["age"] == []
+        assert r["gender"] is None
+        assert r["study_type"] is None
+
+
+class TestSearchIter:
+    async def test_yields_same_results_as_search(self, service, sample_search):
+        service.es.search = _stub(_mock_es_response([SAMPLE_HIT]))
+
+        streamed = [r async for r in service.search_iter(ExtractedEntities())]
+
+        assert streamed == sample_search[0]
+
+    async def test_uses_same_request_body(self, service):
+        service.es.search = AsyncMock(return_value=_mock_es_response([]))
+        async for _ in service.search_iter(ExtractedEntities(), page=2, page_size=5):
+            pass
+
+        call_body = service.es.search.call_args[1]["body"]
+        assert call_body["from"] == 5
+        assert call_body["size"] == 5
+
+
+class TestSearchBatching:
+    async def test_concurrent_searches_share_one_msearch(self, service):
+        first = _mock_es_response([SAMPLE_HIT])
+        second = _mock_es_response([], total=0)
+        service.es.search = AsyncMock()
+        service.es.msearch = AsyncMock(return_value={"responses": [first, second]})
+
+        (r1, t1, _), (r2, t2, _) = await asyncio.gather(
+            service.search(ExtractedEntities(condition="Asthma")),
+            service.search(ExtractedEntities(phase="PHASE3")),
+        )
+
+        assert (t1, t2) == (1, 0)
+        assert r1[0]["nct_id"] == "NCT00000001"
+        assert r2 == []
+        service.es.search.assert_not_awaited()
+        searches = service.es.msearch.call_args[1]["searches"]
+        assert searches[0] == {"index": "clinical_trials"}
+        assert len(searches) == 4
+
+    async def test_msearch_item_error_fails_only_that_search(self, service):
+        service.es.msearch = AsyncMock(
+            return_value={
+                "responses": [
+                    _mock_es_response([SAMPLE_HIT]),
+                    {"error": {"type": "search_phase_execution_exception"}, "status": 400},
+                ]
+            }
+        )
+
+        ok, failed = await asyncio.gather(
+            service.search(ExtractedEntities()),
+            service.search(ExtractedEntities(phase="PHASE3")),
+            return_exceptions=True,
+        )
+
+        assert ok[1] == 1
+        assert isinstance(failed, RuntimeError)
+
+    async def test_window_zero_searches_directly(self, service):
+        service.batch_window = 0
+        service.es.search = AsyncMock(return_value=_mock_es_response([]))
+        service.es.msearch = AsyncMock()
+
+        await asyncio.gather(
+            service.search(ExtractedEntities()),
+            service.search(ExtractedEntities()),
+        )
+
+        assert service.es.search.await_count == 2
+        service.es.msearch.assert_not_awaited()
+
+
+class TestCursor:
+    def test_round_trip(self):
+        values = [2.25, None, "NCT00000009"]
+        assert decode_cursor(encode_cursor(values)) == values
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor([1.0, 10, "NCT/???"])
+        assert "+" not in cursor and "/" not in cursor
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1, 2])])
+    def test_invalid_cursor_raises(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
@@ -0,0 +1,47 @@
+"""Tests for the ingest document transform."""
+
+from app.resources import load_es_mappings
+from scripts.ingest import generate_bulk_actions, transform_document
+
+
+class TestTransformDocument:
+    def test_output_covers_every_mapped_field(self, sample_trial):
+        transformed = transform_document(sample_trial)
+        assert list(transformed) == list(load_es_mappings()["properties"])
+
+    def test_minimal_document_defaults(self, sample_trial_minimal):
+        transformed = transform_document(sample_trial_minimal)
+        assert transformed["nct_id"] == "NCT00000001"
+        assert transformed["brief_title"] == "A Minimal Test Trial"
+        assert transformed["enrollment"] is None
+        assert transformed["has_results"] is None
+        assert transformed["sponsors"] == []
+
+    def test_values_cleaned_by_mapped_type(self):
+        transformed = transform_document({
+            "nct_id": "NCT00000002",
+            "phase": " NA ",
+            "acronym": "  ",
+            "detailed_description": "N/A",
+            "enrollment": "250",
+            "healthy_volunteers": "Yes",
+            "start_date": "2024-01-01",
+            "conditions": None,
+        })
+        assert transformed["phase"] is None
+        assert transformed["acronym"] is None
+        assert transformed["detailed_description"] is None
+        assert transformed["enrollment"] == 250
+        assert transformed["healthy_volunteers"] is True
+        assert transformed["start_date"] == "2024-01-01"
+        assert transformed["conditions"] == []
+
+
+class TestGenerateBulkActions:
+    def test_skips_documents_without_nct_id(self, sample_trial_minimal):
+        actions = list(
+            generate_bulk_actions([{"brief_title": "x"}, sample_trial_minimal], "idx")
+        )
+        assert len(actions) == 1
+        assert actions[0]["_id"] == "NCT00000001"
+        assert actions[0]["_index"] == "idx"
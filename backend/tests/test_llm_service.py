@@ -1,13 +1,18 @@
 """Tests for the LLM entity extraction service."""
 
+import asyncio
 import json
+from dataclasses import dataclass
+from typing import List
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
 from app.models.entities import ExtractedEntities, LocationFilter
 from app.services.llm_service import (
     SYSTEM_PROMPT,
+    _build_system_prompt,
     _parse_json_response,
     _validate_and_normalize,
     extract_entities,
@@ -17,27 +22,32 @@ from app.utils.synonyms import (
     VALID_PHASES,
     VALID_STATUSES,
 )
+from scripts.gen_prompt import MAX_PROMPT_BYTES
 
 
 # ─── Helpers ───
 
 
-def _mock_response(json_data: dict) -> MagicMock:
-    """Create a mock Anthropic Message with JSON content."""
-    content_block = MagicMock()
-    content_block.text = json.dumps(json_data)
-    message = MagicMock()
-    message.content = [content_block]
-    return message
+@dataclass(frozen=True, slots=True)
+class _FakeBlock:
+    text: str
 
 
-def _mock_response_raw(text: str) -> MagicMock:
-    """Create a mock Anthropic Message with raw text content."""
-    content_block = MagicMock()
-    content_block.text = text
-    message = MagicMock()
-    message.content = [content_block]
-    return message
+@dataclass(frozen=True, slots=True)
+class _FakeMessage:
+    """The part of an Anthropic Message the service reads: content[0].text."""
+
+    content: List[_FakeBlock]
+
+
+def _mock_response(json_data: dict) -> _FakeMessage:
+    """Create a fake Anthropic Message with JSON content."""
+    return _mock_response_raw(orjson.dumps(json_data).decode())
+
+
+def _mock_response_raw(text: str) -> _FakeMessage:
+    """Create a fake Anthropic Message with raw text content."""
+    return _FakeMessage(content=[_FakeBlock(text)])
 
 
 # ─── Tests for _parse_json_response ───
@@ -77,6 +87,20 @@ class TestParseJsonResponse:
         with pytest.raises(json.JSONDecodeError):
             _parse_json_response("no json here at all")
 
+    def test_braces_inside_strings_ignored(self):
+        text = 'Result: {"keyword": "a}b{c", "note": "say \\"}\\"", "confidence": 0.7} end'
+        data = _parse_json_response(text)
+        assert data["keyword"] == "a}b{c"
+        assert data["note"] == 'say "}"'
+
+    def test_unbalanced_object_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            _parse_json_response('{"phase": "PHASE2", "location": {"city": "Boston"}')
+
+    def test_pathological_input_is_linear(self):
+        with pytest.raises(json.JSONDecodeError):
+            _parse_json_response("{" * 50_000 + "x")
+
 
 # ─── Tests for _validate_and_normalize ───
 
@@ -103,6 +127,24 @@ class TestValidateAndNormalize:
         result = _validate_and_normalize(data)
         assert result["age_group"] is None
 
+    def test_case_variants_canonicalized(self):
+        data = {"phase": "phase2", "status": "recruiting", "age_group": "ADULT"}
+        result = _validate_and_normalize(data)
+        assert result["phase"] == "PHASE2"
+        assert result["status"] == "RECRUITING"
+        assert result["age_group"] == "adult"
+
+    def test_mixed_case_canonicalized(self):
+        data = {"phase": "Phase2", "status": "Recruiting", "age_group": "Older-Adults"}
+        result = _validate_and_normalize(data)
+        assert result["phase"] == "PHASE2"
+        assert result["status"] == "RECRUITING"
+        assert result["age_group"] == "older-adults"
+
+    def test_non_string_enum_value_set_to_none(self):
+        result = _validate_and_normalize({"phase": 2, "confidence": 0.9})
+        assert result["phase"] is None
+
     def test_valid_combined_phase(self):
         data = {"phase": "PHASE1/PHASE2", "confidence": 0.9}
         result = _validate_and_normalize(data)
@@ -141,6 +183,13 @@ class TestValidateAndNormalize:
         assert result["enrollment_min"] == 500
         assert isinstance(result["enrollment_min"], int)
 
+    def test_enrollment_int_and_float_values(self):
+        data = {"enrollment_min": 100, "enrollment_max": 250.0, "confidence": 0.9}
+        result = _validate_and_normalize(data)
+        assert result["enrollment_min"] == 100
+        assert result["enrollment_max"] == 250
+        assert isinstance(result["enrollment_max"], int)
+
     def test_enrollment_invalid_set_to_none(self):
         data = {"enrollment_min": "not_a_number", "confidence": 0.9}
         result = _validate_and_normalize(data)
@@ -169,20 +218,22 @@ class TestValidateAndNormalize:
 
 
 class TestExtractEntities:
-    @pytest.mark.asyncio
     async def test_empty_query(self):
         result = await extract_entities("")
         assert isinstance(result, ExtractedEntities)
         assert result.confidence < 0.5
         assert result.clarification is not None
 
-    @pytest.mark.asyncio
     async def test_whitespace_query(self):
         result = await extract_entities("   ")
         assert result.confidence < 0.5
         assert result.clarification is not None
 
-    @pytest.mark.asyncio
+    @patch("app.services.llm_service.get_anthropic_client")
+    async def test_blank_query_never_builds_client(self, mock_get_client):
+        await extract_entities(" \t ")
+        mock_get_client.assert_not_called()
+
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_simple_condition_extraction(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -207,7 +258,6 @@ class TestExtractEntities:
         assert result.confidence == 0.95
         assert result.clarification is None
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_complex_multi_field(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -233,7 +283,6 @@ class TestExtractEntities:
         assert result.location.country == "United States"
         assert result.age_group == "adult"
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_combined_phase(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -255,7 +304,6 @@ class TestExtractEntities:
         result = await extract_entities("phase 1/2 studies")
         assert result.phase == "PHASE1/PHASE2"
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_keyword_extraction(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -281,7 +329,6 @@ class TestExtractEntities:
         assert result.condition == "Breast Cancer"
         assert result.keyword == "BRCA1"
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_pediatric_synonym(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -304,7 +351,6 @@ class TestExtractEntities:
         assert result.age_group == "child"
         assert result.condition == "Asthma"
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_sponsor_extraction(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -326,7 +372,6 @@ class TestExtractEntities:
         result = await extract_entities("Pfizer sponsored trials")
         assert result.sponsor == "Pfizer"
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_json_decode_error_fallback(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -339,7 +384,6 @@ class TestExtractEntities:
         assert result.confidence == 0.3
         assert result.clarification is not None
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_api_error_fallback(self, mock_client_cls):
         import anthropic as anthropic_mod
@@ -356,7 +400,20 @@ class TestExtractEntities:
         assert result.confidence == 0.0
         assert "unavailable" in result.clarification.lower()
 
-    @pytest.mark.asyncio
+    @patch("app.services.llm_service.CALL_TIMEOUT", 0.01)
+    @patch("app.services.llm_service.anthropic.AsyncAnthropic")
+    async def test_timeout_returns_unavailable_fallback(self, mock_client_cls):
+        async def hang(**kwargs):
+            await asyncio.sleep(1)
+
+        mock_instance = AsyncMock()
+        mock_client_cls.return_value = mock_instance
+        mock_instance.messages.create.side_effect = hang
+
+        result = await extract_entities("diabetes trials")
+        assert result.confidence == 0.0
+        assert "unavailable" in result.clarification.lower()
+
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_unexpected_error_fallback(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -367,7 +424,32 @@ class TestExtractEntities:
         assert result.confidence == 0.0
         assert result.clarification is not None
 
-    @pytest.mark.asyncio
+    @patch("app.services.llm_service.anthropic.AsyncAnthropic")
+    async def test_system_prompt_sent_as_cached_block(self, mock_client_cls):
+        mock_instance = AsyncMock()
+        mock_client_cls.return_value = mock_instance
+        mock_instance.messages.create.return_value = _mock_response(
+            {"condition": "Asthma", "confidence": 0.9}
+        )
+
+        await extract_entities("asthma trials")
+        (block,) = mock_instance.messages.create.call_args[1]["system"]
+        assert block["text"] == SYSTEM_PROMPT
+        assert block["cache_control"] == {"type": "ephemeral"}
+
+    @patch("app.services.llm_service.anthropic.AsyncAnthropic")
+    async def test_client_reused_across_calls(self, mock_client_cls):
+        mock_instance = AsyncMock()
+        mock_client_cls.return_value = mock_instance
+        mock_instance.messages.create.return_value = _mock_response(
+            {"condition": "Asthma", "confidence": 0.9}
+        )
+
+        await extract_entities("asthma trials")
+        await extract_entities("diabetes trials")
+        mock_client_cls.assert_called_once()
+        assert mock_instance.messages.create.call_count == 2
+
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_markdown_wrapped_json(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -380,7 +462,6 @@ class TestExtractEntities:
         assert result.condition == "Asthma"
         assert result.confidence == 0.85
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_invalid_phase_in_response_normalized(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -395,7 +476,6 @@ class TestExtractEntities:
         assert result.phase is None
         assert result.condition == "Cancer"
 
-    @pytest.mark.asyncio
     @patch("app.services.llm_service.anthropic.AsyncAnthropic")
     async def test_enrollment_extraction(self, mock_client_cls):
         mock_instance = AsyncMock()
@@ -422,6 +502,15 @@ class TestExtractEntities:
 
 
 class TestSystemPrompt:
+    def test_generated_prompt_is_current(self):
+        assert SYSTEM_PROMPT == _build_system_prompt(), (
+            "app/services/_system_prompt.py is stale; "
+            "run `python -m scripts.gen_prompt`"
+        )
+
+    def test_within_size_budget(self):
+        assert len(SYSTEM_PROMPT.encode("utf-8")) <= MAX_PROMPT_BYTES
+
     def test_contains_all_valid_phases(self):
         for phase in VALID_PHASES:
             assert phase in SYSTEM_PROMPT, f"Phase {phase} missing from prompt"
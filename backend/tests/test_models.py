@@ -9,7 +9,6 @@ from app.models.entities import (
     StatusEnum,
 )
 from app.models.schemas import (
-    AgeCategory,
     ErrorResponse,
     Facility,
     SearchResponse,
@@ -120,6 +119,12 @@ class TestExtractedEntities:
         restored = ExtractedEntities(**e.model_dump())
         assert restored == e
 
+    def test_frozen_and_hashable(self):
+        e = ExtractedEntities(location=LocationFilter(city="Boston"))
+        assert hash(e) == hash(ExtractedEntities(location=LocationFilter(city="Boston")))
+        with pytest.raises(ValidationError):
+            e.phase = "PHASE2"
+
 
 class TestSponsor:
     def test_from_real_data(self, sample_trial):
@@ -167,34 +172,20 @@ class TestTrialResult:
         with pytest.raises(ValidationError):
             TrialResult(nct_id="NCT00000001")
 
-    def test_from_real_data(self, sample_trial):
-        trial = TrialResult(
-            nct_id=sample_trial["nct_id"],
-            brief_title=sample_trial["brief_title"],
-            official_title=sample_trial.get("official_title"),
-            phase=sample_trial.get("phase"),
-            overall_status=sample_trial.get("overall_status"),
-            enrollment=sample_trial.get("enrollment_numeric"),
-            sponsors=[Sponsor(**s) for s in sample_trial.get("sponsors", [])],
-            facilities=[Facility(**f) for f in sample_trial.get("facilities", [])],
-            conditions=sample_trial.get("conditions", []),
-            brief_summaries_description=sample_trial.get("brief_summaries_description"),
-            start_date=sample_trial.get("start_date"),
-            completion_date=sample_trial.get("completion_date"),
-            age=[AgeCategory(**a) for a in sample_trial.get("age", [])],
-            gender=sample_trial.get("gender"),
-            study_type=sample_trial.get("study_type"),
-            source=sample_trial.get("source"),
-        )
-        assert trial.nct_id == sample_trial["nct_id"]
-        assert len(trial.sponsors) == len(sample_trial["sponsors"])
+    def test_from_real_data(self, sample_trial, sample_trial_result):
+        assert sample_trial_result.nct_id == sample_trial["nct_id"]
+        assert len(sample_trial_result.sponsors) == len(sample_trial["sponsors"])
+
+    def test_real_data_round_trip(self, sample_trial_result):
+        dumped = sample_trial_result.model_dump()
+        assert TrialResult(**dumped) == sample_trial_result
 
     def test_round_trip(self):
         trial = TrialResult(
             nct_id="NCT12345678",
             brief_title="Test",
             sponsors=[Sponsor(name="Org")],
-            age=[AgeCategory(age_category="adult")],
+            age=["adult"],
         )
         restored = TrialResult(**trial.model_dump())
         assert restored == trial
@@ -1,15 +1,15 @@
 """Tests for the auto-suggestion service."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.services.suggestion import SuggestionService
 
 
-@pytest.fixture
-def service():
-    with patch("app.services.suggestion.Elasticsearch"):
+@pytest.fixture(scope="module")
+def shared_service():
+    with patch("app.services.suggestion.es_service"):
         with patch("app.services.suggestion.get_settings") as mock_settings:
             mock_settings.return_value = MagicMock(
                 es_url="http://localhost:9200",
@@ -19,6 +19,15 @@ def service():
     return svc
 
 
+@pytest.fixture
+def service(shared_service, monkeypatch):
+    # Built once per module; each test gets a fresh client mock and an
+    # empty suggestion cache.
+    monkeypatch.setattr(shared_service, "es", MagicMock())
+    shared_service._cache.clear()
+    return shared_service
+
+
 def _mock_es_response(titles):
     return {
         "hits": {
@@ -28,95 +37,130 @@ def _mock_es_response(titles):
     }
 
 
+def _mock_msearch(primary, fallback=()):
+    return AsyncMock(
+        return_value={
+            "responses": [_mock_es_response(primary), _mock_es_response(fallback)]
+        }
+    )
+
+
 class TestGetSuggestionsValidation:
-    @pytest.mark.asyncio
     async def test_empty_prefix_returns_empty(self, service):
         assert await service.get_suggestions("") == []
 
-    @pytest.mark.asyncio
     async def test_single_char_returns_empty(self, service):
         assert await service.get_suggestions("a") == []
 
-    @pytest.mark.asyncio
     async def test_whitespace_only_returns_empty(self, service):
         assert await service.get_suggestions("   ") == []
 
-    @pytest.mark.asyncio
     async def test_none_prefix_returns_empty(self, service):
         assert await service.get_suggestions(None) == []
 
 
 class TestGetSuggestionsPrimary:
-    @pytest.mark.asyncio
     async def test_returns_titles_from_hits(self, service):
-        service.es.search = MagicMock(
-            return_value=_mock_es_response(
-                ["Dose Escalation Study", "Dose Finding Trial"]
-            )
+        service.es.msearch = _mock_msearch(
+            ["Dose Escalation Study", "Dose Finding Trial"]
         )
         result = await service.get_suggestions("Dose")
         assert result == ["Dose Escalation Study", "Dose Finding Trial"]
 
-    @pytest.mark.asyncio
     async def test_deduplicates_case_insensitive(self, service):
-        service.es.search = MagicMock(
-            return_value=_mock_es_response(["Test Trial", "test trial", "TEST TRIAL"])
-        )
+        service.es.msearch = _mock_msearch(["Test Trial", "test trial", "TEST TRIAL"])
         result = await service.get_suggestions("Test")
-        assert len(result) == 1
+        assert result == ["Test Trial"]
+
+    async def test_deduplicates_casefolded(self, service):
+        service.es.msearch = _mock_msearch(["Straße Study", "STRASSE STUDY"])
+        result = await service.get_suggestions("Stra")
+        assert result == ["Straße Study"]
 
-    @pytest.mark.asyncio
     async def test_respects_limit(self, service):
         titles = [f"Trial {i}" for i in range(20)]
-        service.es.search = MagicMock(return_value=_mock_es_response(titles))
+        service.es.msearch = _mock_msearch(titles)
         result = await service.get_suggestions("Trial", limit=5)
         assert len(result) <= 5
 
-    @pytest.mark.asyncio
     async def test_query_uses_bool_prefix(self, service):
-        service.es.search = MagicMock(
-            return_value=_mock_es_response(["Cancer Study"])
-        )
+        service.es.msearch = _mock_msearch(["Cancer Study"])
         await service.get_suggestions("can")
-        call_body = service.es.search.call_args[1]["body"]
-        assert call_body["query"]["multi_match"]["type"] == "bool_prefix"
+        searches = service.es.msearch.call_args[1]["searches"]
+        assert searches[1]["query"]["multi_match"]["type"] == "bool_prefix"
 
 
 class TestGetSuggestionsFallback:
-    @pytest.mark.asyncio
     async def test_fallback_when_primary_empty(self, service):
-        empty = _mock_es_response([])
-        fallback = _mock_es_response(["Cancer Treatment Study"])
-        service.es.search = MagicMock(side_effect=[empty, fallback])
+        service.es.msearch = _mock_msearch([], ["Cancer Treatment Study"])
         result = await service.get_suggestions("Can")
         assert result == ["Cancer Treatment Study"]
-        assert service.es.search.call_count == 2
 
-    @pytest.mark.asyncio
-    async def test_no_fallback_when_primary_has_results(self, service):
-        primary = _mock_es_response(["Cancer Study"])
-        service.es.search = MagicMock(return_value=primary)
+    async def test_fallback_ignored_when_primary_has_results(self, service):
+        service.es.msearch = _mock_msearch(["Cancer Study"], ["Other Study"])
+        result = await service.get_suggestions("Can")
+        assert result == ["Cancer Study"]
+
+    async def test_single_round_trip(self, service):
+        service.es.msearch = _mock_msearch([], ["Cancer Treatment Study"])
+        await service.get_suggestions("Can")
+        service.es.msearch.assert_awaited_once()
+        searches = service.es.msearch.call_args[1]["searches"]
+        assert searches[3]["query"]["multi_match"]["type"] == "phrase_prefix"
+
+    async def test_failed_primary_falls_back(self, service):
+        service.es.msearch = AsyncMock(
+            return_value={
+                "responses": [
+                    {"error": {"type": "search_phase_execution_exception"}},
+                    _mock_es_response(["Cancer Treatment Study"]),
+                ]
+            }
+        )
         result = await service.get_suggestions("Can")
-        assert service.es.search.call_count == 1
+        assert result == ["Cancer Treatment Study"]
+
+
+class TestGetSuggestionsCache:
+    async def test_repeat_prefix_served_from_cache(self, service):
+        service.es.msearch = _mock_msearch(["Cancer Study"])
+        first = await service.get_suggestions("Can")
+        second = await service.get_suggestions(" can ")
+        assert first == second == ["Cancer Study"]
+        service.es.msearch.assert_awaited_once()
+
+    async def test_limit_is_part_of_key(self, service):
+        service.es.msearch = _mock_msearch(["Cancer Study"])
+        await service.get_suggestions("Can", limit=5)
+        await service.get_suggestions("Can", limit=10)
+        assert service.es.msearch.await_count == 2
+
+    async def test_empty_result_not_cached(self, service):
+        service.es.msearch = _mock_msearch([])
+        await service.get_suggestions("Xyz")
+        await service.get_suggestions("Xyz")
+        assert service.es.msearch.await_count == 2
 
 
 class TestGetConditionSuggestions:
-    @pytest.mark.asyncio
     async def test_matching_prefix(self, service):
         result = await service.get_condition_suggestions("Brea")
         assert "Breast Cancer" in result
 
-    @pytest.mark.asyncio
     async def test_case_insensitive(self, service):
         result = await service.get_condition_suggestions("dia")
         assert "Diabetes" in result
 
-    @pytest.mark.asyncio
     async def test_no_match(self, service):
         result = await service.get_condition_suggestions("xyz")
         assert result == []
 
-    @pytest.mark.asyncio
+    async def test_prefix_between_neighbours(self, service):
+        result = await service.get_condition_suggestions("mu")
+        assert result == ["Multiple Sclerosis"]
+        result = await service.get_condition_suggestions("  LE ")
+        assert result == ["Leukemia"]
+
     async def test_short_prefix_returns_empty(self, service):
         result = await service.get_condition_suggestions("a")
         assert result == []
@@ -0,0 +1,87 @@
+"""Tests for the AI summary service."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.schemas import TrialResult
+from app.services.summary_service import (
+    _format_trial,
+    generate_summary,
+)
+
+# Trusted literal: built without validation, as es_service returns hits.
+SAMPLE_RESULT = TrialResult.model_construct(
+    nct_id="NCT00000001",
+    brief_title="Test Trial for Asthma",
+    phase="PHASE2",
+    overall_status="RECRUITING",
+    enrollment=120,
+    conditions=[{"name": "Asthma"}],
+).model_dump()
+
+
+def _mock_message(text: str) -> MagicMock:
+    msg = MagicMock()
+    msg.content = [MagicMock(text=text)]
+    return msg
+
+
+@pytest.fixture
+def mock_client():
+    client = AsyncMock()
+    client.messages.create.return_value = _mock_message(" Summary [1]. ")
+    with patch("app.services.summary_service.settings") as mock_settings:
+        mock_settings.anthropic_api_key = "test-key"
+        mock_settings.claude_model = "test-model"
+        with patch(
+            "app.services.summary_service.get_anthropic_client",
+            return_value=client,
+        ):
+            yield client
+
+
+class TestFormatTrial:
+    def test_renders_numbered_block(self):
+        trial = {
+            **SAMPLE_RESULT,
+            "sponsors": [{"name": "Pfizer"}],
+            "conditions": [{"name": "Asthma", "mesh": ""}, {"name": "COPD"}],
+        }
+        assert _format_trial(2, trial) == (
+            "[2] Test Trial for Asthma\n"
+            "    NCT ID: NCT00000001\n"
+            "    Phase: PHASE2\n"
+            "    Status: RECRUITING\n"
+            "    Conditions: Asthma, COPD\n"
+            "    Sponsor: Pfizer\n"
+            "    Enrollment: 120"
+        )
+
+    def test_missing_values_use_placeholders(self):
+        trial = {**SAMPLE_RESULT, "phase": None, "enrollment": None, "conditions": []}
+        block = _format_trial(1, trial)
+        assert "Phase: N/A" in block
+        assert "Conditions: N/A" in block
+        assert "Sponsor: Unknown" in block
+        assert "Enrollment: N/A" in block
+
+
+class TestGenerateSummary:
+    async def test_returns_stripped_text(self, mock_client):
+        assert await generate_summary([SAMPLE_RESULT], "asthma") == "Summary [1]."
+
+    async def test_empty_results_skip_api(self, mock_client):
+        assert await generate_summary([], "asthma") is None
+        mock_client.messages.create.assert_not_called()
+
+    async def test_system_and_trials_are_cache_breakpoints(self, mock_client):
+        await generate_summary([SAMPLE_RESULT], "asthma")
+
+        kwargs = mock_client.messages.create.call_args[1]
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        trials_block, query_block = kwargs["messages"][0]["content"]
+        assert trials_block["cache_control"] == {"type": "ephemeral"}
+        assert "NCT00000001" in trials_block["text"]
+        assert "cache_control" not in query_block
+        assert '"asthma"' in query_block["text"]
@@ -33,10 +33,6 @@ export interface Facility {
   status?: string;
 }
 
-export interface AgeCategory {
-  age_category: string;
-}
-
 export interface TrialResult {
   nct_id: string;
   brief_title: string;
@@ -50,7 +46,7 @@ export interface TrialResult {
   brief_summaries_description?: string;
   start_date?: string;
   completion_date?: string;
-  age: AgeCategory[];
+  age: string[];
   gender?: string;
   study_type?: string;
   source?: string;
@@ -64,6 +60,7 @@ export interface SearchResponse {
   page_size: number;
   clarification?: string;
   summary?: string;
+  next_cursor?: string;
 }
 
 export interface SuggestionResponse {